@@ -3,21 +3,127 @@ Evolution API Endpoints
 
 NEAT進化のためのAPIエンドポイント。
 Step 5でセッション管理を実装。
+
+同一セッションへの状態変更・計算を伴うリクエストはセッション単位のasyncio.Lockで直列化し、
+異なるセッション間のリクエストは互いにブロックしません。
+読み取り専用の /genomes と /status はロックを取得しません。
+
+async def / def の使い分け:
+- async def のエンドポイントはイベントループ上で実行されるため、ブロッキング処理を直接呼ばないこと。
+  CPU負荷の高い処理（集団生成・進化・パターン生成・制約チェック）は _run_in_executor で
+  スレッドプールに渡してから await する。
+- ロックの取得や await を含まない、ブロッキングする同期処理だけのエンドポイントを追加する場合は
+  def で宣言し、FastAPIのスレッドプールで実行させる。
+- /genomes と /status はキャッシュ済みの値を返すだけのO(1)処理のため、async def のまま
+  イベントループ上で実行する（スレッドプールへの切り替えの方がコストが大きい）。
+
+サーバー:
+- uvloop（イベントループ）と httptools（HTTPパーサー）で実行すること。
+  どちらも uvicorn[standard] に含まれ、インストール済みであればUvicornが自動的に使用する。
+  明示する場合: uvicorn main:app --loop uvloop --http httptools
+- セッションはプロセス内に保持されるため、--workers は 1 のまま使用すること。
 """
 
 import os
-from fastapi import APIRouter, HTTPException, Header
+import asyncio
+import multiprocessing
+import orjson
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from fastapi import APIRouter, Body, Depends, HTTPException, Header, Request, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Any
-from neat_core.population_manager import PopulationManager
+from typing import List, Optional, Any, Tuple
+from neat_core.population_manager import PopulationManager, check_genome_constraints, load_config
 from models.animation import Animation
 from api.session_manager import get_session_manager
-from constraints.constraint_checker import ConstraintParams, check_all_genomes
+from constraints.constraint_checker import ConstraintParams, summarize_results
 
 
 # ルーターを作成
 router = APIRouter(prefix="/api/evolution", tags=["evolution"])
 
+# NEAT設定ファイルのパス（モジュール読み込み時に一度だけ解決）
+_CONFIG_PATH = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    '..',
+    'config',
+    'neat_config.txt'
+))
+
+# 全セッションで共有するNEAT設定（一度だけ解析し、セッション作成時にコピーして使用）
+_SHARED_CONFIG = load_config(_CONFIG_PATH)
+
+# CPU負荷の高いNEAT処理（集団生成・進化・パターン生成）を実行するスレッドプール
+# PopulationManagerはプロセス内のセッションに保持されるため、プロセスプールではなくスレッドプールを使用
+_executor = ThreadPoolExecutor(thread_name_prefix="neat-worker")
+
+
+async def _run_in_executor(func, *args, **kwargs):
+    """
+    同期関数をスレッドプールで実行し、イベントループをブロックしないようにする
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
+
+
+# 制約チェック用のプロセスプール（初回の使用時に生成し、世代・セッションをまたいで使い回す）
+# サーバープロセスはNEAT処理用のスレッドを動かしているため、forkすると子プロセスが
+# 保持中のロックを引き継いでデッドロックする恐れがある。ワーカーはspawnで起動する
+# セッションを持たない純粋な関数（ゲノムと設定を引数に取る）だけをここで実行する
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """
+    制約チェック用のプロセスプールを取得（未生成なら生成）
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+
+def shutdown_process_pool():
+    """
+    プロセスプールを終了（アプリケーション終了時に呼び出す）
+    """
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
+
+
+async def require_session_id(x_session_id: str = Header(None, alias="X-Session-ID")) -> str:
+    """
+    X-Session-IDヘッダーを必須とする依存関係
+    """
+    if not x_session_id:
+        raise HTTPException(
+            status_code=400,
+            detail="セッションIDが指定されていません。X-Session-IDヘッダーを設定してください。"
+        )
+    return x_session_id
+
+
+async def require_pm(x_session_id: str = Depends(require_session_id)) -> PopulationManager:
+    """
+    セッションIDに対応するPopulationManagerを解決する依存関係
+
+    同一リクエスト内ではFastAPIが結果をキャッシュするため、解決は一度だけ行われます。
+    """
+    population_manager = get_session_manager().get_session(x_session_id)
+
+    if population_manager is None:
+        raise HTTPException(
+            status_code=404,
+            detail="セッションが見つかりません。/api/evolution/initializeで新しいセッションを開始してください。"
+        )
+    return population_manager
+
 
 # リクエスト/レスポンスモデル
 class InitializeRequest(BaseModel):
@@ -124,6 +230,101 @@ class EvolutionHistoryResponse(BaseModel):
     total_generations: int
 
 
+def _construct_response(model_cls, **fields) -> ORJSONResponse:
+    """
+    出力専用モデルを検証なしで構築し、orjsonでシリアライズしたレスポンスを返す
+
+    内部状態から組み立てた値のみを渡すこと（リクエスト由来の値は検証されません）。
+    """
+    return ORJSONResponse(model_cls.model_construct(**fields).model_dump())
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """
+    If-None-Matchヘッダーが指定のETagと一致するか判定
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return etag in (tag.strip() for tag in if_none_match.split(","))
+
+
+def _build_cppn_structure(population_manager: PopulationManager, genome_id: int, genome) -> CPPNStructure:
+    """
+    ゲノムからCPPN構造レスポンスを構築
+
+    Args:
+        population_manager: ゲノムが属するPopulationManager
+        genome_id: ゲノムID
+        genome: NEATゲノム
+    """
+    # Extract CPPN structure
+    # 入出力ノードIDはセッション作成時に計算済みのものを使う
+    input_ids = population_manager.input_ids
+    output_ids = population_manager.output_ids
+    hidden_ids = [nid for nid in genome.nodes if nid not in output_ids]
+
+    # Build node list
+    # 内部で生成した信頼できるデータのため、model_constructでバリデーションを省略する
+    input_labels = ["x", "y", "z", "d"]
+    output_labels = ["vx", "vy", "vz", "r", "g", "b"]
+    genome_nodes = genome.nodes
+
+    # Input nodes
+    nodes = [
+        CPPNNode.model_construct(
+            id=nid,
+            type="input",
+            label=input_labels[i] if i < len(input_labels) else f"input_{i}",
+            activation="identity",
+            bias=0.0
+        )
+        for i, nid in enumerate(input_ids)
+    ]
+
+    # Output nodes
+    nodes += [
+        CPPNNode.model_construct(
+            id=nid,
+            type="output",
+            label=output_labels[i] if i < len(output_labels) else f"output_{i}",
+            activation=genome_nodes[nid].activation,
+            bias=genome_nodes[nid].bias
+        )
+        for i, nid in enumerate(output_ids)
+        if nid in genome_nodes
+    ]
+
+    # Hidden nodes
+    nodes += [
+        CPPNNode.model_construct(
+            id=nid,
+            type="hidden",
+            label=f"h{nid}",
+            activation=genome_nodes[nid].activation,
+            bias=genome_nodes[nid].bias
+        )
+        for nid in hidden_ids
+    ]
+
+    # Build connection list
+    connections = [
+        CPPNConnection.model_construct(
+            from_node=conn_key[0],
+            to_node=conn_key[1],
+            weight=conn.weight,
+            enabled=conn.enabled
+        )
+        for conn_key, conn in genome.connections.items()
+    ]
+
+    return CPPNStructure.model_construct(
+        genome_id=genome_id,
+        nodes=nodes,
+        connections=connections
+    )
+
+
 # エンドポイント実装
 
 @router.post("/initialize", response_model=InitializeResponse)
@@ -131,23 +332,15 @@ async def initialize(request: InitializeRequest):
     """
     新しい進化セッションを初期化し、セッションIDを発行
     """
-    # 設定ファイルのパス
-    config_path = os.path.join(
-        os.path.dirname(__file__),
-        '..',
-        'config',
-        'neat_config.txt'
-    )
-    config_path = os.path.abspath(config_path)
-
     try:
-        session_manager = get_session_manager()
-        session_id = session_manager.create_session(
-            config_path,
+        # 集団の生成（制約を満たすまでのサンプリング）はスレッドプールで行い、
+        # セッションの登録はイベントループ上で行う（SessionManagerの状態はイベントループからのみ変更する）
+        population_manager = await _run_in_executor(
+            PopulationManager.from_config,
+            _SHARED_CONFIG,
             num_drones=request.num_drones
         )
-
-        population_manager = session_manager.get_session(session_id)
+        session_id = get_session_manager().create_session(population_manager)
 
         return InitializeResponse(
             session_id=session_id,
@@ -159,40 +352,39 @@ async def initialize(request: InitializeRequest):
         raise HTTPException(status_code=500, detail=f"初期化エラー: {str(e)}")
 
 
-@router.get("/genomes", response_model=GenomesResponse)
-async def get_genomes(x_session_id: str = Header(None, alias="X-Session-ID")):
+@router.get("/genomes", response_model=GenomesResponse, response_class=ORJSONResponse)
+async def get_genomes(
+    request: Request,
+    x_session_id: str = Depends(require_session_id),
+    population_manager: PopulationManager = Depends(require_pm)
+):
     """
     現在の世代の全ゲノムIDを取得
-    """
-    if not x_session_id:
-        raise HTTPException(
-            status_code=400,
-            detail="セッションIDが指定されていません。X-Session-IDヘッダーを設定してください。"
-        )
 
-    session_manager = get_session_manager()
-    population_manager = session_manager.get_session(x_session_id)
-
-    if population_manager is None:
-        raise HTTPException(
-            status_code=404,
-            detail="セッションが見つかりません。/api/evolution/initializeで新しいセッションを開始してください。"
-        )
-
-    genome_ids = population_manager.get_genome_ids()
-
-    return GenomesResponse(
+    ゲノムIDは世代が変わるまで変化しないため、(セッションID, 世代) のETagを返します。
+    """
+    # ロックを取らないため、ETagと本文は同じスナップショットから組み立てる
+    generation, genome_ids, _ = population_manager.get_status_snapshot()
+    etag = f'"{x_session_id}:{generation}"'
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response = _construct_response(
+        GenomesResponse,
         genome_ids=genome_ids,
-        generation=population_manager.get_generation(),
-        population_size=population_manager.get_population_size()
+        generation=generation,
+        population_size=len(genome_ids)
     )
+    response.headers["ETag"] = etag
+    return response
 
 
-@router.get("/pattern/{genome_id}", response_model=Animation)
+@router.get("/pattern/{genome_id}", response_model=Animation, response_class=ORJSONResponse)
 async def get_pattern(
     genome_id: int,
     duration: float = 3.0,
-    x_session_id: str = Header(None, alias="X-Session-ID")
+    x_session_id: str = Depends(require_session_id),
+    population_manager: PopulationManager = Depends(require_pm)
 ):
     """
     特定のゲノムからアニメーションパターンを生成
@@ -201,88 +393,94 @@ async def get_pattern(
         genome_id: ゲノムID
         duration: アニメーションの長さ（秒）
     """
-    if not x_session_id:
-        raise HTTPException(
-            status_code=400,
-            detail="セッションIDが指定されていません。X-Session-IDヘッダーを設定してください。"
-        )
+    # キャッシュキーと生成に同じ値を使うため、長さを丸めておく
+    duration = round(duration, 3)
 
-    session_manager = get_session_manager()
-    population_manager = session_manager.get_session(x_session_id)
-
-    if population_manager is None:
-        raise HTTPException(
-            status_code=404,
-            detail="セッションが見つかりません。/api/evolution/initializeで新しいセッションを開始してください。"
-        )
+    async with get_session_manager().session_lock(x_session_id):
+        # 同じ世代で生成済みならPopulationManagerのキャッシュから返す
+        animation = population_manager.get_cached_pattern(genome_id, duration, as_json=True)
 
-    animation = population_manager.generate_pattern(genome_id, duration)
+        if animation is None:
+            animation = await _run_in_executor(
+                population_manager.generate_pattern, genome_id, duration, as_json=True
+            )
 
     if animation is None:
         raise HTTPException(status_code=404, detail=f"ゲノムID {genome_id} が見つかりません")
 
-    return animation
+    # Animationモデルを経由せずに生成したJSONをそのまま返す（スキーマはresponse_modelで文書化）
+    return Response(content=animation, media_type="application/json")
 
 
 @router.post("/fitness", response_model=FitnessResponse)
 async def assign_fitness(
     request: FitnessRequest,
-    x_session_id: str = Header(None, alias="X-Session-ID")
+    x_session_id: str = Depends(require_session_id),
+    population_manager: PopulationManager = Depends(require_pm)
 ):
     """
     ゲノムに適応度を割り当て
     """
-    if not x_session_id:
-        raise HTTPException(
-            status_code=400,
-            detail="セッションIDが指定されていません。X-Session-IDヘッダーを設定してください。"
-        )
+    async with get_session_manager().session_lock(x_session_id):
+        success = population_manager.assign_fitness(request.genome_id, request.fitness)
 
-    session_manager = get_session_manager()
-    population_manager = session_manager.get_session(x_session_id)
+    if not success:
+        raise HTTPException(status_code=404, detail=f"ゲノムID {request.genome_id} が見つかりません")
 
-    if population_manager is None:
+    return FitnessResponse(
+        success=True,
+        message=f"ゲノム {request.genome_id} に適応度 {request.fitness:.4f} を割り当てました"
+    )
+
+
+@router.post("/fitness/batch", response_model=FitnessResponse)
+async def assign_fitness_batch(
+    pairs: List[Tuple[int, float]] = Body(..., description="[ゲノムID, 適応度] のペアのリスト"),
+    x_session_id: str = Depends(require_session_id),
+    population_manager: PopulationManager = Depends(require_pm)
+):
+    """
+    複数のゲノムに一括で適応度を割り当て
+
+    1件ずつ /fitness を呼ぶ代わりに、[[genome_id, fitness], ...] をまとめて送信します。
+    いずれかのペアが不正な場合は、どのゲノムにも割り当てません。
+    """
+    # 範囲チェックはリクエストモデルを使わず、ここで一度にまとめて行う
+    out_of_range = [genome_id for genome_id, fitness in pairs if not 0.0 <= fitness <= 1.0]
+    if out_of_range:
         raise HTTPException(
-            status_code=404,
-            detail="セッションが見つかりません。/api/evolution/initializeで新しいセッションを開始してください。"
+            status_code=422,
+            detail=f"適応度は0.0〜1.0の範囲で指定してください（ゲノムID: {out_of_range}）"
         )
 
-    success = population_manager.assign_fitness(request.genome_id, request.fitness)
+    async with get_session_manager().session_lock(x_session_id):
+        missing = [genome_id for genome_id, _ in pairs if population_manager.get_genome(genome_id) is None]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"ゲノムID {missing} が見つかりません")
 
-    if not success:
-        raise HTTPException(status_code=404, detail=f"ゲノムID {request.genome_id} が見つかりません")
+        population_manager.assign_fitness_batch(dict(pairs))
 
     return FitnessResponse(
         success=True,
-        message=f"ゲノム {request.genome_id} に適応度 {request.fitness:.4f} を割り当てました"
+        message=f"{len(pairs)} 個のゲノムに適応度を割り当てました"
     )
 
 
 @router.post("/evolve", response_model=EvolveResponse)
 async def evolve(
     request: EvolveRequest,
-    x_session_id: str = Header(None, alias="X-Session-ID")
+    x_session_id: str = Depends(require_session_id),
+    population_manager: PopulationManager = Depends(require_pm)
 ):
     """
     次世代に進化
     """
-    if not x_session_id:
-        raise HTTPException(
-            status_code=400,
-            detail="セッションIDが指定されていません。X-Session-IDヘッダーを設定してください。"
-        )
-
-    session_manager = get_session_manager()
-    population_manager = session_manager.get_session(x_session_id)
-
-    if population_manager is None:
-        raise HTTPException(
-            status_code=404,
-            detail="セッションが見つかりません。/api/evolution/initializeで新しいセッションを開始してください。"
-        )
-
     try:
-        success = population_manager.evolve(default_fitness=request.default_fitness)
+        async with get_session_manager().session_lock(x_session_id):
+            success = await _run_in_executor(
+                population_manager.evolve,
+                default_fitness=request.default_fitness
+            )
 
         return EvolveResponse(
             success=success,
@@ -294,161 +492,110 @@ async def evolve(
         raise HTTPException(status_code=500, detail=f"進化エラー: {str(e)}")
 
 
-@router.get("/status", response_model=StatusResponse)
-async def get_status(x_session_id: str = Header(None, alias="X-Session-ID")):
+@router.get("/status", response_model=StatusResponse, response_class=ORJSONResponse)
+async def get_status(request: Request, x_session_id: str = Header(None, alias="X-Session-ID")):
     """
     進化セッションのステータスを取得
 
     セッションIDが指定されていない場合は、セッションが未初期化として扱います。
+    適応度の割り当て数も変化するため、ETagは (セッションID, 世代, 割り当て済み数) から生成します。
     """
     if not x_session_id:
-        return StatusResponse(initialized=False)
+        return _construct_response(StatusResponse, initialized=False)
 
     session_manager = get_session_manager()
     population_manager = session_manager.get_session(x_session_id)
 
     if population_manager is None:
-        return StatusResponse(initialized=False)
+        return _construct_response(StatusResponse, initialized=False)
+
+    # ロックを取らないため、ETagと本文は同じスナップショットから組み立てる
+    generation, genome_ids, assigned = population_manager.get_status_snapshot()
+    etag = f'"{x_session_id}:{generation}:{assigned}"'
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
 
-    return StatusResponse(
+    total = len(genome_ids)
+    response = _construct_response(
+        StatusResponse,
         initialized=True,
-        generation=population_manager.get_generation(),
-        population_size=population_manager.get_population_size(),
-        fitness_status=population_manager.get_fitness_status()
+        generation=generation,
+        population_size=total,
+        fitness_status={
+            "total": total,
+            "assigned": assigned,
+            "unassigned": total - assigned
+        }
     )
+    response.headers["ETag"] = etag
+    return response
+
+
+def _serialize_cppn_structure(population_manager: PopulationManager, genome_id: int, genome) -> bytes:
+    """
+    CPPN構造をJSONバイト列にシリアライズ
+
+    PopulationManager.get_cppn_json()に渡し、結果はゲノムごとにキャッシュされます。
+    """
+    cppn = _build_cppn_structure(population_manager, genome_id, genome)
+    return orjson.dumps(cppn.model_dump(by_alias=True))
 
 
 @router.get("/cppn/{genome_id}", response_model=CPPNStructure)
 async def get_cppn_structure(
     genome_id: int,
-    x_session_id: str = Header(None, alias="X-Session-ID")
+    request: Request,
+    x_session_id: str = Depends(require_session_id),
+    population_manager: PopulationManager = Depends(require_pm)
 ):
     """
     特定のゲノムのCPPN構造を取得
 
+    ゲノムの構造は世代内で変化しないため、(セッションID, 世代, ゲノムID) のETagを返します。
+    シリアライズ済みのJSONはゲノムごとにキャッシュし、2回目以降はそのまま返します。
+
     Args:
         genome_id: ゲノムID
     """
-    if not x_session_id:
-        raise HTTPException(
-            status_code=400,
-            detail="セッションIDが指定されていません。X-Session-IDヘッダーを設定してください。"
+    etag = f'"{x_session_id}:{population_manager.get_generation()}:{genome_id}"'
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    async with get_session_manager().session_lock(x_session_id):
+        data = await _run_in_executor(
+            population_manager.get_cppn_json,
+            genome_id,
+            partial(_serialize_cppn_structure, population_manager)
         )
 
-    session_manager = get_session_manager()
-    population_manager = session_manager.get_session(x_session_id)
-
-    if population_manager is None:
-        raise HTTPException(
-            status_code=404,
-            detail="セッションが見つかりません。"
-        )
-
-    genome = population_manager.get_genome(genome_id)
-
-    if genome is None:
+    if data is None:
         raise HTTPException(
             status_code=404,
             detail=f"ゲノムID {genome_id} が見つかりません"
         )
 
-    # Extract CPPN structure
-    config = population_manager.config
-    num_inputs = config.genome_config.num_inputs
-    num_outputs = config.genome_config.num_outputs
-
-    # Input node IDs are negative
-    input_ids = list(range(-num_inputs, 0))
-    output_ids = list(range(num_outputs))
-    hidden_ids = [nid for nid in genome.nodes.keys() if nid >= num_outputs]
-
-    # Build node list
-    nodes = []
-
-    # Input nodes
-    input_labels = ["x", "y", "z", "d"]
-    for i, nid in enumerate(input_ids):
-        nodes.append(CPPNNode(
-            id=nid,
-            type="input",
-            label=input_labels[i] if i < len(input_labels) else f"input_{i}",
-            activation="identity",
-            bias=0.0
-        ))
-
-    # Output nodes
-    output_labels = ["vx", "vy", "vz", "r", "g", "b"]
-    for i, nid in enumerate(output_ids):
-        node = genome.nodes.get(nid)
-        if node:
-            nodes.append(CPPNNode(
-                id=nid,
-                type="output",
-                label=output_labels[i] if i < len(output_labels) else f"output_{i}",
-                activation=node.activation,
-                bias=node.bias
-            ))
-
-    # Hidden nodes
-    for nid in hidden_ids:
-        node = genome.nodes[nid]
-        nodes.append(CPPNNode(
-            id=nid,
-            type="hidden",
-            label=f"h{nid}",
-            activation=node.activation,
-            bias=node.bias
-        ))
-
-    # Build connection list
-    connections = []
-    for conn_key, conn in genome.connections.items():
-        connections.append(CPPNConnection(
-            **{
-                "from": conn_key[0],
-                "to": conn_key[1],
-                "weight": conn.weight,
-                "enabled": conn.enabled
-            }
-        ))
-
-    return CPPNStructure(
-        genome_id=genome_id,
-        nodes=nodes,
-        connections=connections
-    )
+    return Response(content=data, media_type="application/json", headers={"ETag": etag})
 
 
-@router.get("/history", response_model=EvolutionHistoryResponse)
+@router.get("/history", response_model=EvolutionHistoryResponse, response_class=ORJSONResponse)
 async def get_evolution_history(
-    x_session_id: str = Header(None, alias="X-Session-ID")
+    x_session_id: str = Depends(require_session_id),
+    population_manager: PopulationManager = Depends(require_pm)
 ):
     """
     進化履歴を取得
 
     全世代のゲノム情報（ID、親情報、適応度）を返します。
     """
-    if not x_session_id:
-        raise HTTPException(
-            status_code=400,
-            detail="セッションIDが指定されていません。X-Session-IDヘッダーを設定してください。"
-        )
+    async with get_session_manager().session_lock(x_session_id):
+        history = await _run_in_executor(population_manager.get_evolution_history)
 
-    session_manager = get_session_manager()
-    population_manager = session_manager.get_session(x_session_id)
-
-    if population_manager is None:
-        raise HTTPException(
-            status_code=404,
-            detail="セッションが見つかりません。"
-        )
-
-    history = population_manager.get_evolution_history()
-
-    return EvolutionHistoryResponse(
-        history=history,
-        total_generations=len(history)
-    )
+        # 履歴はdataclassのリストなので、Pydanticモデルを経由せずorjsonで直接シリアライズ
+        # （履歴が進化処理で更新される前に、ロック内でシリアライズを完了させる）
+        return ORJSONResponse({
+            "history": history,
+            "total_generations": len(history)
+        })
 
 
 class ConstraintCheckResponse(BaseModel):
@@ -459,66 +606,69 @@ class ConstraintCheckResponse(BaseModel):
 
 @router.post("/constraints/check", response_model=ConstraintCheckResponse)
 async def check_constraints(
-    x_session_id: str = Header(None, alias="X-Session-ID")
+    x_session_id: str = Depends(require_session_id),
+    population_manager: PopulationManager = Depends(require_pm)
 ):
     """
     全12個体の制約違反をチェックし、コンソールにログ出力
     """
-    if not x_session_id:
-        raise HTTPException(
-            status_code=400,
-            detail="セッションIDが指定されていません。"
-        )
-
-    session_manager = get_session_manager()
-    population_manager = session_manager.get_session(x_session_id)
-
-    if population_manager is None:
-        raise HTTPException(
-            status_code=404,
-            detail="セッションが見つかりません。"
-        )
-
-    # 全ゲノムのアニメーションを生成
-    genome_ids = population_manager.get_genome_ids()
-    animations = []
-    for genome_id in genome_ids:
-        animation = population_manager.generate_pattern(genome_id, duration=3.0)
-        if animation:
-            animations.append(animation)
-
-    # 制約チェック
-    params = ConstraintParams()
-    check_result = check_all_genomes(animations, params)
-
-    # コンソール出力
-    print("\n" + "=" * 60)
-    print("CONSTRAINT CHECK RESULTS")
-    print("=" * 60)
-    print(f"Parameters:")
-    print(f"  Bounds: X[{params.x_min}, {params.x_max}], Y[{params.y_min}, {params.y_max}], Z[{params.z_min}, {params.z_max}]")
-    print(f"  Max Speed: horizontal={params.max_horizontal_speed}m/s, vertical={params.max_vertical_speed}m/s")
-    print(f"  Min Distance: {params.min_distance}m")
-    print("-" * 60)
+    async with get_session_manager().session_lock(x_session_id):
+        # 全ゲノムのアニメーションを生成
+        genome_ids = population_manager.get_genome_ids()
+        params = ConstraintParams()
+        loop = asyncio.get_running_loop()
+        pool = _get_process_pool()
+        # アニメーション生成と制約チェックはゲノムごとに独立しているため、
+        # ワーカープロセスに並列で割り当てる（ゲノムと設定だけを渡す）
+        results = await asyncio.gather(*[
+            loop.run_in_executor(
+                pool,
+                check_genome_constraints,
+                population_manager.get_genome(genome_id),
+                population_manager.config,
+                population_manager.num_drones,
+                3.0,
+                params
+            )
+            for genome_id in genome_ids
+        ])
+        check_result = summarize_results(list(results), params)
+
+    # コンソール出力（レポートをまとめて組み立て、1回の書き込みで出力する）
+    lines = [
+        "\n" + "=" * 60,
+        "CONSTRAINT CHECK RESULTS",
+        "=" * 60,
+        "Parameters:",
+        f"  Bounds: X[{params.x_min}, {params.x_max}], Y[{params.y_min}, {params.y_max}], Z[{params.z_min}, {params.z_max}]",
+        f"  Max Speed: horizontal={params.max_horizontal_speed}m/s, vertical={params.max_vertical_speed}m/s",
+        f"  Min Distance: {params.min_distance}m",
+        "-" * 60,
+    ]
 
     for result in check_result["results"]:
         status = "PASS" if result.passes_all else "FAIL"
-        print(f"\nGenome {result.genome_id}: {status}")
-        print(f"  Bounds:     {result.bounds_violations} violations (max: {result.max_bounds_violation:.3f}m)")
-        print(f"  H-Speed:    {result.horizontal_speed_violations} violations")
-        print(f"  V-Speed:    {result.vertical_speed_violations} violations")
         min_dist = result.min_distance_observed if result.min_distance_observed != float('inf') else 0
-        print(f"  Distance:   {result.distance_violations} violations (min: {min_dist:.3f}m)")
+        lines += [
+            f"\nGenome {result.genome_id}: {status}",
+            f"  Bounds:     {result.bounds_violations} violations (max: {result.max_bounds_violation:.3f}m)",
+            f"  H-Speed:    {result.horizontal_speed_violations} violations",
+            f"  V-Speed:    {result.vertical_speed_violations} violations",
+            f"  Distance:   {result.distance_violations} violations (min: {min_dist:.3f}m)",
+        ]
 
     summary = check_result["summary"]
-    print("\n" + "-" * 60)
-    print("SUMMARY")
-    print(f"  Pass bounds:    {summary['pass_bounds']}/{summary['total']}")
-    print(f"  Pass h-speed:   {summary['pass_h_speed']}/{summary['total']}")
-    print(f"  Pass v-speed:   {summary['pass_v_speed']}/{summary['total']}")
-    print(f"  Pass distance:  {summary['pass_distance']}/{summary['total']}")
-    print(f"  Pass ALL:       {summary['pass_all']}/{summary['total']}")
-    print("=" * 60 + "\n")
+    lines += [
+        "\n" + "-" * 60,
+        "SUMMARY",
+        f"  Pass bounds:    {summary['pass_bounds']}/{summary['total']}",
+        f"  Pass h-speed:   {summary['pass_h_speed']}/{summary['total']}",
+        f"  Pass v-speed:   {summary['pass_v_speed']}/{summary['total']}",
+        f"  Pass distance:  {summary['pass_distance']}/{summary['total']}",
+        f"  Pass ALL:       {summary['pass_all']}/{summary['total']}",
+        "=" * 60 + "\n",
+    ]
+    print("\n".join(lines))
 
     return ConstraintCheckResponse(
         success=True,
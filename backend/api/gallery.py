@@ -1,4 +1,7 @@
+import asyncio
+
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional
 
@@ -45,7 +48,7 @@ async def save_animation(request: SaveAnimationRequest):
     Save an animation to the gallery.
     """
     try:
-        animation_id = db.save_animation(request.animation_data, request.cppn_data)
+        animation_id = await asyncio.to_thread(db.save_animation, request.animation_data, request.cppn_data)
         return SaveAnimationResponse(
             id=animation_id,
             message="Animation saved successfully"
@@ -54,17 +57,21 @@ async def save_animation(request: SaveAnimationRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/animations", response_model=AnimationListResponse)
+@router.get("/animations", response_model=AnimationListResponse, response_class=ORJSONResponse)
 async def get_animations(offset: int = 0, limit: int = 50):
     """
     Get a list of saved animations (id and created_at only).
+
+    total is the number of all saved animations, not just this page.
     """
     try:
-        animations = db.get_animations_list(offset=offset, limit=limit)
-        return AnimationListResponse(
-            animations=animations,
-            total=len(animations)
-        )
+        rows = await asyncio.to_thread(db.get_animations_list, offset=offset, limit=limit)
+        total = await asyncio.to_thread(db.count_animations)
+        # Rows come straight from the database, so serialize them without model validation
+        return ORJSONResponse({
+            "animations": [{"id": id_, "created_at": created_at} for id_, created_at in rows],
+            "total": total
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -75,7 +82,7 @@ async def get_animation(animation_id: int):
     Get a single animation by ID.
     """
     try:
-        animation = db.get_animation(animation_id)
+        animation = await asyncio.to_thread(db.get_animation, animation_id)
         if animation is None:
             raise HTTPException(status_code=404, detail="Animation not found")
         return AnimationDetailResponse(**animation)
@@ -91,7 +98,7 @@ async def delete_animation(animation_id: int):
     Delete an animation by ID.
     """
     try:
-        deleted = db.delete_animation(animation_id)
+        deleted = await asyncio.to_thread(db.delete_animation, animation_id)
         if not deleted:
             raise HTTPException(status_code=404, detail="Animation not found")
         return DeleteResponse(
@@ -4,9 +4,11 @@ Session Manager for Evolution API
 マルチユーザー対応のためのセッション管理を提供します。
 """
 
-import uuid
-from typing import Dict, Optional
-from datetime import datetime, timedelta
+import time
+import secrets
+import heapq
+import asyncio
+from typing import Dict, List, Optional, Tuple
 from neat_core.population_manager import PopulationManager
 
 
@@ -22,26 +24,34 @@ class SessionManager:
         Args:
             session_timeout_minutes: セッションのタイムアウト時間（分）
         """
-        self._sessions: Dict[str, PopulationManager] = {}
-        self._last_access: Dict[str, datetime] = {}
-        self._session_timeout = timedelta(minutes=session_timeout_minutes)
-
-    def create_session(self, config_path: str, num_drones: int = 5) -> str:
+        # セッションID -> (PopulationManager, 最終アクセス時刻[time.monotonic()])
+        self._sessions: Dict[str, Tuple[PopulationManager, float]] = {}
+        # (有効期限, セッションID) のヒープ
+        # アクセスのたびには更新せず、クリーンアップ時に実際の有効期限を確認する（遅延削除）
+        self._expiry_heap: List[Tuple[float, str]] = []
+        # セッションごとのロック（異なるセッション間のリクエストは互いにブロックしない）
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._session_timeout = session_timeout_minutes * 60.0
+
+    def create_session(self, population_manager: PopulationManager) -> str:
         """
         新しいセッションを作成
 
+        セッションの辞書・有効期限ヒープ・ロックはイベントループ上でのみ変更するため、
+        時間のかかるPopulationManagerの生成はスレッドプールで済ませてから、イベントループ上で呼び出すこと。
+
         Args:
-            config_path: NEAT設定ファイルパス
-            num_drones: ドローン数
+            population_manager: このセッション用に生成したPopulationManager
 
         Returns:
             str: 生成されたセッションID
         """
-        session_id = str(uuid.uuid4())
-        population_manager = PopulationManager(config_path, num_drones)
+        session_id = secrets.token_urlsafe(16)
 
-        self._sessions[session_id] = population_manager
-        self._last_access[session_id] = datetime.now()
+        now = time.monotonic()
+        self._sessions[session_id] = (population_manager, now)
+        heapq.heappush(self._expiry_heap, (now + self._session_timeout, session_id))
+        self._locks[session_id] = asyncio.Lock()
 
         return session_id
 
@@ -55,12 +65,14 @@ class SessionManager:
         Returns:
             PopulationManager or None: セッションが存在する場合はPopulationManager
         """
-        if session_id not in self._sessions:
+        entry = self._sessions.get(session_id)
+        if entry is None:
             return None
 
         # 最終アクセス時刻を更新
-        self._last_access[session_id] = datetime.now()
-        return self._sessions[session_id]
+        population_manager = entry[0]
+        self._sessions[session_id] = (population_manager, time.monotonic())
+        return population_manager
 
     def delete_session(self, session_id: str) -> bool:
         """
@@ -74,10 +86,28 @@ class SessionManager:
         """
         if session_id in self._sessions:
             del self._sessions[session_id]
-            del self._last_access[session_id]
+            self._locks.pop(session_id, None)
             return True
         return False
 
+    def session_lock(self, session_id: str) -> asyncio.Lock:
+        """
+        セッション単位のasyncio.Lockを取得
+
+        ロックはセッション作成時にイベントループ上で登録されます。
+        存在しないセッションIDに対してはロックを登録せず、共有されないロックを返します。
+
+        Args:
+            session_id: セッションID
+
+        Returns:
+            asyncio.Lock: セッション専用のロック
+        """
+        lock = self._locks.get(session_id)
+        if lock is None:
+            return asyncio.Lock()
+        return lock
+
     def cleanup_expired_sessions(self) -> int:
         """
         タイムアウトしたセッションを削除
@@ -85,17 +115,27 @@ class SessionManager:
         Returns:
             int: 削除されたセッション数
         """
-        now = datetime.now()
-        expired_sessions = [
-            session_id
-            for session_id, last_access in self._last_access.items()
-            if now - last_access > self._session_timeout
-        ]
-
-        for session_id in expired_sessions:
-            self.delete_session(session_id)
-
-        return len(expired_sessions)
+        now = time.monotonic()
+        heap = self._expiry_heap
+        removed = 0
+
+        # 期限切れの可能性があるエントリだけをヒープの先頭から取り出す
+        while heap and heap[0][0] < now:
+            _, session_id = heapq.heappop(heap)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                # 削除済みセッションの古いエントリ
+                continue
+
+            expiry = entry[1] + self._session_timeout
+            if expiry < now:
+                self.delete_session(session_id)
+                removed += 1
+            else:
+                # 期限切れ前にアクセスされていたため、実際の有効期限で入れ直す
+                heapq.heappush(heap, (expiry, session_id))
+
+        return removed
 
     def get_session_count(self) -> int:
         """
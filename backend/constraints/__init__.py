@@ -3,6 +3,7 @@ from constraints.constraint_checker import (
     ConstraintParams,
     GenomeConstraintResult,
     check_all_genomes,
+    summarize_results,
 )
 
 __all__ = [
@@ -10,4 +11,5 @@ __all__ = [
     "ConstraintParams",
     "GenomeConstraintResult",
     "check_all_genomes",
+    "summarize_results",
 ]
@@ -3,6 +3,7 @@ Drone Constraint Checker
 """
 
 import math
+import numpy as np
 from dataclasses import dataclass
 from typing import List
 from models.animation import Animation
@@ -47,69 +48,129 @@ class ConstraintChecker:
         self.params = params
 
     def check_animation(self, animation: Animation) -> GenomeConstraintResult:
-        result = GenomeConstraintResult(genome_id=animation.id)
-        frames = animation.frames
-
-        for frame_idx, frame in enumerate(frames):
-            drones = frame.drones
-
-            # 1. 飛行区域チェック
-            for drone in drones:
-                violation = self._check_bounds(drone.x, drone.y, drone.z)
-                if violation > 0:
-                    result.bounds_violations += 1
-                    result.max_bounds_violation = max(result.max_bounds_violation, violation)
-
-            # 2. 速度チェック
-            if frame_idx > 0:
-                prev_drones = frames[frame_idx - 1].drones
-                for curr, prev in zip(drones, prev_drones):
-                    h_speed, v_speed = self._calculate_speeds(prev, curr)
-                    if h_speed > self.params.max_horizontal_speed:
-                        result.horizontal_speed_violations += 1
-                    if v_speed > self.params.max_vertical_speed:
-                        result.vertical_speed_violations += 1
-
-            # 3. ドローン間距離チェック
-            for i in range(len(drones)):
-                for j in range(i + 1, len(drones)):
-                    dist = self._calculate_distance(drones[i], drones[j])
-                    result.min_distance_observed = min(result.min_distance_observed, dist)
-                    if dist < self.params.min_distance:
-                        result.distance_violations += 1
-
-        return result
-
-    def _check_bounds(self, x: float, y: float, z: float) -> float:
-        violations = [
-            max(0, self.params.x_min - x),
-            max(0, x - self.params.x_max),
-            max(0, self.params.y_min - y),
-            max(0, y - self.params.y_max),
-            max(0, self.params.z_min - z),
-            max(0, z - self.params.z_max),
+        return self.check_positions(animation.id, animation.position_array())
+
+    def check_positions(
+        self,
+        genome_id: int,
+        positions: np.ndarray,
+        short_circuit: bool = False
+    ) -> GenomeConstraintResult:
+        """
+        位置の配列から制約をチェック（Animationモデルを経由しない）
+
+        Args:
+            genome_id: ゲノムID
+            positions: (フレーム数, ドローン数, 3) の位置配列
+            short_circuit: Trueのとき違反が見つかった時点で残りのチェックを省略する
+                （合否だけが必要な場合用。省略したチェックの違反数は0のまま）
+        """
+        # 軸ごとに連続した (3, フレーム数, ドローン数) 配列にしておき、
+        # 各チェックは軸単位で同じバッファに累積して中間配列を減らす
+        xs, ys, zs = np.ascontiguousarray(np.asarray(positions, dtype=np.float64).transpose(2, 0, 1))
+        return self._check_axes(genome_id, xs, ys, zs, short_circuit)
+
+    def check_many(
+        self,
+        genome_ids: List[int],
+        positions: np.ndarray,
+        short_circuit: bool = False
+    ) -> List[GenomeConstraintResult]:
+        """
+        複数ゲノムの位置配列をまとめてチェック
+
+        Args:
+            genome_ids: ゲノムIDのリスト
+            positions: (ゲノム数, フレーム数, ドローン数, 3) の位置配列
+            short_circuit: Trueのとき違反が見つかった時点で残りのチェックを省略する
+        """
+        # 全ゲノム分を一度に軸ごとの連続した (3, ゲノム数, フレーム数, ドローン数) 配列に並べ替える
+        axes = np.ascontiguousarray(np.asarray(positions, dtype=np.float64).transpose(3, 0, 1, 2))
+        return [
+            self._check_axes(genome_id, xs, ys, zs, short_circuit)
+            for genome_id, xs, ys, zs in zip(genome_ids, *axes)
         ]
-        return max(violations)
 
-    def _calculate_speeds(self, prev_drone, curr_drone) -> tuple:
-        dx = curr_drone.x - prev_drone.x
-        dy = curr_drone.y - prev_drone.y
-        dz = curr_drone.z - prev_drone.z
-        h_speed = math.sqrt(dx * dx + dy * dy) / self.params.dt
-        v_speed = abs(dz) / self.params.dt
-        return h_speed, v_speed
+    def _check_axes(
+        self,
+        genome_id: int,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        zs: np.ndarray,
+        short_circuit: bool
+    ) -> GenomeConstraintResult:
+        """軸ごとの (フレーム数, ドローン数) 位置配列から全ての制約をチェック"""
+        result = GenomeConstraintResult(genome_id=genome_id)
+        # 計算量の小さい順にチェックする（ドローン間距離はドローン数の2乗に比例）
+        for check in (self._check_bounds, self._check_speeds, self._check_distances):
+            check(result, xs, ys, zs)
+            if short_circuit and not result.passes_all:
+                break
 
-    def _calculate_distance(self, drone1, drone2) -> float:
-        dx = drone2.x - drone1.x
-        dy = drone2.y - drone1.y
-        dz = drone2.z - drone1.z
-        return math.sqrt(dx * dx + dy * dy + dz * dz)
+        return result
+
+    def _check_bounds(self, result: GenomeConstraintResult, xs: np.ndarray, ys: np.ndarray, zs: np.ndarray):
+        """飛行区域チェック（各軸の下限・上限からのはみ出し量の最大値）"""
+        params = self.params
+        violation = np.zeros(xs.shape)
+        for values, low, high in (
+            (xs, params.x_min, params.x_max),
+            (ys, params.y_min, params.y_max),
+            (zs, params.z_min, params.z_max),
+        ):
+            np.maximum(violation, low - values, out=violation)
+            np.maximum(violation, values - high, out=violation)
+        result.bounds_violations = int(np.count_nonzero(violation))
+        if result.bounds_violations:
+            result.max_bounds_violation = float(violation.max())
+
+    def _check_speeds(self, result: GenomeConstraintResult, xs: np.ndarray, ys: np.ndarray, zs: np.ndarray):
+        """速度チェック（連続するフレーム間の変位から算出）"""
+        params = self.params
+        dx = np.diff(xs, axis=0)
+        dy = np.diff(ys, axis=0)
+        dz = np.diff(zs, axis=0)
+        np.multiply(dx, dx, out=dx)
+        np.multiply(dy, dy, out=dy)
+        np.add(dx, dy, out=dx)
+        h_speed = np.sqrt(dx, out=dx)
+        h_speed /= params.dt
+        v_speed = np.abs(dz, out=dz)
+        v_speed /= params.dt
+        result.horizontal_speed_violations = int(np.count_nonzero(h_speed > params.max_horizontal_speed))
+        result.vertical_speed_violations = int(np.count_nonzero(v_speed > params.max_vertical_speed))
+
+    def _check_distances(self, result: GenomeConstraintResult, xs: np.ndarray, ys: np.ndarray, zs: np.ndarray):
+        """ドローン間距離チェック（全ペア i < j）"""
+        # ドローンiとそれ以降のドローンとの差を連続したスライスで計算し、
+        # インデックス配列によるペアの収集（コピー）を避ける
+        # 比較は距離の2乗で行い、平方根は最小距離の報告時に1回だけ計算する
+        num_frames, num_drones = xs.shape
+        if not num_frames:
+            return
+        min_distance_sq = self.params.min_distance * self.params.min_distance
+        min_observed_sq = result.min_distance_observed
+        distance_violations = 0
+        for i in range(num_drones - 1):
+            dx = xs[:, i + 1:] - xs[:, i:i + 1]
+            dy = ys[:, i + 1:] - ys[:, i:i + 1]
+            dz = zs[:, i + 1:] - zs[:, i:i + 1]
+            dist_sq = dx * dx
+            dist_sq += dy * dy
+            dist_sq += dz * dz
+            min_observed_sq = min(min_observed_sq, dist_sq.min())
+            distance_violations += np.count_nonzero(dist_sq < min_distance_sq)
+        result.min_distance_observed = math.sqrt(min_observed_sq)
+        result.distance_violations = int(distance_violations)
 
 
 def check_all_genomes(animations: List[Animation], params: ConstraintParams) -> dict:
     checker = ConstraintChecker(params)
     results = [checker.check_animation(anim) for anim in animations]
+    return summarize_results(results, params)
+
 
+def summarize_results(results: List[GenomeConstraintResult], params: ConstraintParams) -> dict:
     summary = {
         "total": len(results),
         "pass_bounds": sum(1 for r in results if r.bounds_violations == 0),
@@ -1,5 +1,7 @@
+import os
 import sqlite3
-import json
+import threading
+import orjson
 from datetime import datetime
 from pathlib import Path
 from contextlib import contextmanager
@@ -8,40 +10,64 @@ from typing import Optional
 # Database file path
 DB_PATH = Path(__file__).parent / "gallery.db"
 
+# WAL journaling is opt-in (GALLERY_DB_WAL=1). journal_mode=WAL is persisted in the
+# database file and creates -wal/-shm sidecars, so it stays off by default to leave
+# the gallery.db checked into the repository untouched.
+USE_WAL = os.environ.get("GALLERY_DB_WAL") == "1"
+
 
 def get_connection():
-    """Get a database connection."""
-    conn = sqlite3.connect(str(DB_PATH))
+    """Get a new database connection."""
+    # Shared across the threads that serve requests; access is serialized by _lock
+    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    if USE_WAL:
+        # WAL mode makes a full fsync on every commit unnecessary
+        conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA mmap_size=268435456")
     return conn
 
 
+# Single long-lived connection reused by every request
+_conn: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+
 @contextmanager
 def get_db():
-    """Context manager for database connections."""
-    conn = get_connection()
-    try:
-        yield conn
-        conn.commit()
-    except Exception:
-        conn.rollback()
-        raise
-    finally:
-        conn.close()
+    """Context manager for the shared database connection."""
+    global _conn
+    with _lock:
+        if _conn is None:
+            _conn = get_connection()
+        try:
+            yield _conn
+            _conn.commit()
+        except Exception:
+            _conn.rollback()
+            raise
 
 
 def init_db():
     """Initialize the database and create tables if they don't exist."""
     with get_db() as conn:
         cursor = conn.cursor()
+        if USE_WAL:
+            # journal_mode is persistent, so it only needs to be set once per database file
+            cursor.execute("PRAGMA journal_mode=WAL")
+        # Payloads are orjson-encoded BLOBs (older rows may still hold JSON TEXT)
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS saved_animations (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                animation_data TEXT NOT NULL,
-                cppn_data TEXT NOT NULL,
+                animation_data BLOB NOT NULL,
+                cppn_data BLOB NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_saved_animations_created_at
+            ON saved_animations (created_at DESC)
+        """)
 
 
 def save_animation(animation_data: dict, cppn_data: dict) -> int:
@@ -62,7 +88,7 @@ def save_animation(animation_data: dict, cppn_data: dict) -> int:
             INSERT INTO saved_animations (animation_data, cppn_data)
             VALUES (?, ?)
             """,
-            (json.dumps(animation_data), json.dumps(cppn_data))
+            (orjson.dumps(animation_data), orjson.dumps(cppn_data))
         )
         return cursor.lastrowid
 
@@ -76,10 +102,12 @@ def get_animations_list(offset: int = 0, limit: int = 50) -> list:
         limit: Maximum number of items to return
 
     Returns:
-        List of animations with id and created_at
+        List of (id, created_at) tuples
     """
     with get_db() as conn:
         cursor = conn.cursor()
+        # Plain tuples are enough here; skip building sqlite3.Row objects
+        cursor.row_factory = None
         cursor.execute(
             """
             SELECT id, created_at
@@ -89,8 +117,20 @@ def get_animations_list(offset: int = 0, limit: int = 50) -> list:
             """,
             (limit, offset)
         )
-        rows = cursor.fetchall()
-        return [{"id": row["id"], "created_at": row["created_at"]} for row in rows]
+        return cursor.fetchall()
+
+
+def count_animations() -> int:
+    """
+    Count all saved animations.
+
+    Returns:
+        Total number of saved animations
+    """
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM saved_animations")
+        return cursor.fetchone()[0]
 
 
 def get_animation(animation_id: int) -> Optional[dict]:
@@ -118,8 +158,8 @@ def get_animation(animation_id: int) -> Optional[dict]:
             return None
         return {
             "id": row["id"],
-            "animation_data": json.loads(row["animation_data"]),
-            "cppn_data": json.loads(row["cppn_data"]),
+            "animation_data": orjson.loads(row["animation_data"]),
+            "cppn_data": orjson.loads(row["cppn_data"]),
             "created_at": row["created_at"]
         }
 
@@ -1,13 +1,58 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from api import routes
 from api import evolution
 from api import gallery
+from api.session_manager import get_session_manager
+
+# 期限切れセッションを削除する間隔（秒）
+# セッションのタイムアウト（60分）の1/4ごとに実行する
+SESSION_CLEANUP_INTERVAL_SECONDS = 15 * 60
+
+
+async def _cleanup_sessions_periodically():
+    """
+    期限切れセッションを定期的に削除するバックグラウンドタスク
+
+    放置されたセッションのPopulationManager（ゲノムやキャッシュ）がメモリに残り続けないようにします。
+    """
+    while True:
+        await asyncio.sleep(SESSION_CLEANUP_INTERVAL_SECONDS)
+        removed = get_session_manager().cleanup_expired_sessions()
+        if removed:
+            print(f"Removed {removed} expired session(s)")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    アプリケーションの起動・終了処理
+
+    起動時にセッションのクリーンアップタスクを開始し、終了時に停止します。
+    終了時には制約チェック用のプロセスプールも終了します。
+    """
+    cleanup_task = asyncio.create_task(_cleanup_sessions_periodically())
+    try:
+        yield
+    finally:
+        cleanup_task.cancel()
+        try:
+            await cleanup_task
+        except asyncio.CancelledError:
+            pass
+        evolution.shutdown_process_pool()
+
 
 app = FastAPI(
     title="Drone Picbreeder API",
     description="NEAT/CPPNを用いたドローンショーのパターン生成API",
-    version="0.1.0"
+    version="0.1.0",
+    # レスポンスのJSONシリアライズにorjsonを使用
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS設定（開発環境用）
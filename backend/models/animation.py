@@ -5,10 +5,27 @@ Animation Data Models
 フロントエンドが期待するJSON形式に対応しています。
 """
 
+from operator import attrgetter
 from typing import List
+import numpy as np
 from pydantic import BaseModel, Field
 
 
+# DroneStateと同じフィールドを持つNumPyの構造化dtype
+# 生成処理の内部では、フレーム×ドローンの状態をPythonオブジェクトではなくこの形式の連続した配列で扱う
+# 位置はfloat32ではなくfloat64で保持する。この配列はtolist()でそのままJSON・DroneStateの値になるため、
+# float32にするとPythonのfloatに戻したときに丸め誤差が現れ（0.464 -> 0.46399998664855957）、
+# ミリメートル単位に丸めたJSONの値が崩れ、出力サイズも増える
+DRONE_STATE_DTYPE = np.dtype([
+    ("x", np.float64),
+    ("y", np.float64),
+    ("z", np.float64),
+    ("r", np.uint8),
+    ("g", np.uint8),
+    ("b", np.uint8),
+])
+
+
 class DroneState(BaseModel):
     """
     単一のドローンの状態（位置と色）
@@ -55,6 +72,64 @@ class Animation(BaseModel):
     id: int = Field(..., description="ゲノムID")
     frames: List[Frame] = Field(..., description="アニメーションフレームのリスト")
 
+    @classmethod
+    def from_structured(cls, genome_id: int, states: np.ndarray, dt: float) -> "Animation":
+        """
+        DRONE_STATE_DTYPEの構造化配列からAnimationを作成
+
+        Args:
+            genome_id: ゲノムID
+            states: (フレーム数, ドローン数) のDRONE_STATE_DTYPE配列
+            dt: フレーム間の時間（秒）
+
+        Returns:
+            Animation: 作成したアニメーション
+        """
+        return cls(id=genome_id, frames=cls.frame_dicts_from_structured(states, dt))
+
+    @staticmethod
+    def frame_dicts_from_structured(states: np.ndarray, dt: float) -> List[dict]:
+        """
+        DRONE_STATE_DTYPEの構造化配列を、Frameと同じ形式の辞書のリストに変換
+
+        Pydanticモデルを構築せずにJSONへシリアライズする用途にも使用します。
+
+        Args:
+            states: (フレーム数, ドローン数) のDRONE_STATE_DTYPE配列
+            dt: フレーム間の時間（秒）
+
+        Returns:
+            List[dict]: Frameと同じ形式の辞書のリスト（フレームiの時刻は i * dt）
+        """
+        # 構造化配列のtolist()は各ドローンを1つのタプルにする
+        return [
+            {
+                "t": frame_idx * dt,
+                "drones": [
+                    {"x": x, "y": y, "z": z, "r": r, "g": g, "b": b}
+                    for x, y, z, r, g, b in drones
+                ]
+            }
+            for frame_idx, drones in enumerate(states.tolist())
+        ]
+
+    def position_array(self) -> np.ndarray:
+        """
+        全フレームの位置を (フレーム数, ドローン数, 3) のfloat64配列に変換
+
+        制約チェックなど、フレーム×ドローンの一括計算に使用します。
+        """
+        num_frames = len(self.frames)
+        num_drones = len(self.frames[0].drones) if self.frames else 0
+        get_position = attrgetter("x", "y", "z")
+        # 中間のリストを作らず、値を直接配列に書き込む
+        values = np.fromiter(
+            (value for frame in self.frames for drone in frame.drones for value in get_position(drone)),
+            dtype=np.float64,
+            count=num_frames * num_drones * 3
+        )
+        return values.reshape(num_frames, num_drones, 3)
+
     class Config:
         json_schema_extra = {
             "example": {
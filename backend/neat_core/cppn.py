@@ -5,10 +5,56 @@ CPPN (Compositional Pattern Producing Networks) Wrapper
 CPPNは3D座標を入力として、その位置でのドローンの速度と色を出力します。
 """
 
-import math
+from typing import Dict, Tuple
+import numpy as np
 import neat
 
 
+def _sigmoid_activation(z: np.ndarray) -> np.ndarray:
+    z = np.clip(5.0 * z, -60.0, 60.0)
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+def _tanh_activation(z: np.ndarray) -> np.ndarray:
+    return np.tanh(np.clip(2.5 * z, -60.0, 60.0))
+
+
+def _sin_activation(z: np.ndarray) -> np.ndarray:
+    return np.sin(np.clip(5.0 * z, -60.0, 60.0))
+
+
+def _gauss_activation(z: np.ndarray) -> np.ndarray:
+    z = np.clip(z, -3.4, 3.4)
+    return np.exp(-5.0 * z ** 2)
+
+
+def _relu_activation(z: np.ndarray) -> np.ndarray:
+    return np.where(z > 0.0, z, 0.0)
+
+
+def _identity_activation(z: np.ndarray) -> np.ndarray:
+    return z
+
+
+# バッチ評価で使用する数値型
+# 重み・バイアス・各ノードの値をfloat32で保持し、float64に比べてメモリ転送量を半分にする
+# （位置の時間積分はPatternGenerator側でfloat64のまま行う）
+_BATCH_DTYPE = np.float32
+
+# query_batch_memoizedで記憶する座標配列の最大数（CPPNインスタンスごと）
+_BATCH_QUERY_CACHE_SIZE = 16
+
+# neat-pythonの組み込み活性化関数と同じ計算を配列全体に適用するNumPy版
+_BATCH_ACTIVATIONS = {
+    'sigmoid': _sigmoid_activation,
+    'tanh': _tanh_activation,
+    'sin': _sin_activation,
+    'gauss': _gauss_activation,
+    'relu': _relu_activation,
+    'identity': _identity_activation,
+}
+
+
 class CPPN:
     """
     CPPNラッパークラス
@@ -39,6 +85,156 @@ class CPPN:
         # 色: 生の出力を 0-255 の RGB 範囲にマッピング
         self.color_min = 0
         self.color_max = 255
+        # (raw + 1) / 2 * (max - min) を1回の乗算で行うための係数
+        # （2での除算は誤差なしのため、結果は元の式と一致する）
+        self._color_scale = (self.color_max - self.color_min) / 2.0
+
+        # バッチ評価用の評価計画（ノードの評価順はneat-pythonのトポロジカル順をそのまま使用）
+        self._batch_plan = self._build_batch_plan()
+
+        # query_batch_memoized用のキャッシュ（座標配列のバイト列 -> (速度, 色)）
+        self._batch_query_cache: Dict[bytes, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def _build_batch_plan(self) -> list:
+        """
+        ネットワークを層ごとにNumPyでまとめて評価するための評価計画を作成
+
+        node_evalsはneat-pythonのトポロジカル順（層順）に並んでいるため、
+        同じ層の他ノードに依存しない連続したノードを1つの層としてまとめます。
+        総和で集約するノードは層ごとに1回の行列積で評価し、
+        それ以外の集約関数を持つノードはノード単位で評価します。
+
+        Returns:
+            list: 層ごとの (総和ノードの評価計画 or None, その他のノードの評価計画リスト)
+                  総和ノードの評価計画は (ノードID, 入力ノードID, 重み行列, バイアス, レスポンス, 活性化関数グループ)
+        """
+        # node_evalsを層に分割
+        layers = []
+        current = []
+        current_nodes = set()
+        for node_eval in self.network.node_evals:
+            links = node_eval[5]
+            if any(i in current_nodes for i, _ in links):
+                layers.append(current)
+                current = []
+                current_nodes = set()
+            current.append(node_eval)
+            current_nodes.add(node_eval[0])
+        if current:
+            layers.append(current)
+
+        plan = []
+        for layer in layers:
+            sum_nodes = []
+            other_nodes = []
+            for node, act_func, agg_func, bias, response, links in layer:
+                node_gene = self.genome.nodes[node]
+
+                activation = _BATCH_ACTIVATIONS.get(node_gene.activation)
+                if activation is None:
+                    # NumPy版がない活性化関数はスカラー版を要素ごとに適用
+                    activation = np.vectorize(act_func, otypes=[float])
+
+                if node_gene.aggregation == 'sum':
+                    sum_nodes.append((node, activation, bias, response, links))
+                else:
+                    # パラメータはバッチ評価と同じ数値型に変換しておく
+                    links = [(i, _BATCH_DTYPE(w)) for i, w in links]
+                    other_nodes.append(
+                        (node, activation, agg_func, _BATCH_DTYPE(bias), _BATCH_DTYPE(response), links)
+                    )
+
+            plan.append((self._build_layer_plan(sum_nodes) if sum_nodes else None, other_nodes))
+        return plan
+
+    @staticmethod
+    def _build_layer_plan(sum_nodes: list) -> tuple:
+        """
+        総和で集約する同じ層のノードをまとめ、行列積用の重み行列などを作成
+
+        Args:
+            sum_nodes: (ノードID, 活性化関数, バイアス, レスポンス, 入力リンク) のリスト
+
+        Returns:
+            tuple: (ノードID, 入力ノードID, 重み行列 (ノード数, 入力数), バイアス, レスポンス, 活性化関数グループ)
+        """
+        nodes = [node for node, _, _, _, _ in sum_nodes]
+        sources = sorted({i for _, _, _, _, links in sum_nodes for i, _ in links})
+        source_index = {i: k for k, i in enumerate(sources)}
+
+        weights = np.zeros((len(nodes), len(sources)), dtype=_BATCH_DTYPE)
+        for row, (_, _, _, _, links) in enumerate(sum_nodes):
+            for i, w in links:
+                weights[row, source_index[i]] += w
+
+        biases = np.array([[bias] for _, _, bias, _, _ in sum_nodes], dtype=_BATCH_DTYPE)
+        responses = np.array([[response] for _, _, _, response, _ in sum_nodes], dtype=_BATCH_DTYPE)
+
+        # 同じ活性化関数を持つ行をまとめ、関数呼び出しを活性化関数の種類数に抑える
+        groups = {}
+        for row, (_, activation, _, _, _) in enumerate(sum_nodes):
+            groups.setdefault(activation, []).append(row)
+        activation_groups = [
+            (activation, None if len(rows) == len(nodes) else np.array(rows))
+            for activation, rows in groups.items()
+        ]
+
+        return nodes, sources, weights, biases, responses, activation_groups
+
+    def activate_batch(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        複数サンプルの入力行列でネットワークをまとめて活性化
+
+        FeedForwardNetwork.activate()をサンプルごとに呼ぶのと同じ計算を、
+        トポロジー順の各層で配列演算として1回ずつ行います。
+
+        Args:
+            inputs: (N, 入力数) の入力行列
+
+        Returns:
+            np.ndarray: (N, 出力数) の出力行列
+        """
+        # 入力ノードごとの列を取り出して評価し、出力ノードごとの列を並べ直す
+        return np.stack(self._activate_batch(list(inputs.T)), axis=1)
+
+    def _activate_batch(self, inputs: list) -> list:
+        """
+        複数サンプルの入力でネットワークをまとめて活性化
+
+        Args:
+            inputs: 入力ノードごとの (N,) 配列のリスト
+
+        Returns:
+            list: 出力ノードごとの (N,) 配列のリスト
+        """
+        num_samples = len(inputs[0])
+        values = {
+            key: np.asarray(value, dtype=_BATCH_DTYPE)
+            for key, value in zip(self.network.input_nodes, inputs)
+        }
+
+        for layer, other_nodes in self._batch_plan:
+            if layer is not None:
+                nodes, sources, weights, biases, responses, activation_groups = layer
+                # 層内の全ノードの重み付き総和を1回の行列積で計算: (ノード数, 入力数) @ (入力数, N)
+                z = biases + responses * (weights @ np.stack([values[i] for i in sources]))
+                for activation, rows in activation_groups:
+                    if rows is None:
+                        z = np.asarray(activation(z), dtype=_BATCH_DTYPE)
+                    else:
+                        z[rows] = activation(z[rows])
+                for row, node in enumerate(nodes):
+                    values[node] = z[row]
+
+            for node, activation, aggregation, bias, response, links in other_nodes:
+                node_inputs = [values[i] * w for i, w in links]
+                s = np.array([aggregation(list(col)) for col in zip(*node_inputs)], dtype=_BATCH_DTYPE) \
+                    if node_inputs else np.full(num_samples, aggregation([]), dtype=_BATCH_DTYPE)
+                values[node] = np.asarray(activation(bias + response * s), dtype=_BATCH_DTYPE)
+
+        # 入力から到達できない出力ノードは0.0（FeedForwardNetworkと同じ挙動）
+        zeros = np.zeros(num_samples, dtype=_BATCH_DTYPE)
+        return [values.get(key, zeros) for key in self.network.output_nodes]
 
     def query(self, x: float, y: float, z: float) -> dict:
         """
@@ -55,7 +251,7 @@ class CPPN:
                 - 'color': {'r': int, 'g': int, 'b': int} (0-255)
         """
         # 原点からの距離を計算（放射対称パターン用）
-        d = math.sqrt(x**2 + y**2 + z**2)
+        d = (x * x + y * y + z * z) ** 0.5
 
         # ネットワークを活性化: 4入力 → 6出力
         raw_output = self.network.activate([x, y, z, d])
@@ -90,6 +286,69 @@ class CPPN:
             'color': color
         }
 
+    def query_batch(self, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        複数の3D座標でまとめてCPPNにクエリ
+
+        query()と同じ計算を、ドローン単位のPythonループではなく配列演算で行います。
+
+        Args:
+            positions: (N, 3) の座標配列 (メートル)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]:
+                - 速度 (N, 3) (m/s)
+                - 色 (N, 3) 0-255の整数 (uint8)
+        """
+        # 入力 (x, y, z, d) を入力ノードごとの行として1つの配列に書き込む
+        inputs = np.empty((4, len(positions)), dtype=_BATCH_DTYPE)
+        inputs[:3] = positions.T
+        # 原点からの距離を計算（放射対称パターン用）
+        inputs[3] = np.sqrt((positions * positions).sum(axis=1))
+
+        # ネットワークを活性化: 4入力 → 6出力
+        raw_output = self.activate_batch(inputs.T)
+
+        velocities = raw_output[:, 0:3] * self.velocity_scale
+
+        # _scale_to_colorと同じ変換（[-1, 1]を想定して[0, 255]にスケールしクリップ）
+        # 一時配列を1つだけ作り、以降はその場で更新する
+        scaled = raw_output[:, 3:6] + 1.0
+        scaled *= self._color_scale
+        if self.color_min:
+            scaled += self.color_min
+        # 分岐なしでクリップし、uint8へ直接キャストする
+        # クリップ後の値は非負のため、切り捨てはint()と同じ結果になる
+        np.clip(scaled, self.color_min, self.color_max, out=scaled)
+        colors = scaled.astype(np.uint8)
+
+        return velocities, colors
+
+    def query_batch_memoized(self, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        query_batch()の結果を座標ごとに記憶して返す
+
+        CPPNは決定的な関数のため、同じ座標（初期グリッド配置など）に対する結果は再利用できます。
+        キーは座標配列のバイト列そのもので、値を丸めないため結果はquery_batch()と完全に一致します。
+        返す配列は共有されるため読み取り専用です。
+
+        Args:
+            positions: (N, 3) の座標配列 (メートル)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: query_batch()と同じ (速度, 色)
+        """
+        key = positions.tobytes()
+        cached = self._batch_query_cache.get(key)
+        if cached is None:
+            velocities, colors = self.query_batch(positions)
+            velocities.setflags(write=False)
+            colors.setflags(write=False)
+            cached = (velocities, colors)
+            if len(self._batch_query_cache) < _BATCH_QUERY_CACHE_SIZE:
+                self._batch_query_cache[key] = cached
+        return cached
+
     def _scale_to_color(self, raw_value: float) -> int:
         """
         生のネットワーク出力を0-255のRGB値にスケール
@@ -101,14 +360,10 @@ class CPPN:
             int: 0-255の範囲にクリップされた整数値
         """
         # 生の値を[-1, 1]または[0, 1]の範囲と仮定
-        # まず[0, 1]の範囲にマッピング
-        # tanh等の[-1, 1]出力の場合: (raw + 1) / 2
+        # tanh等の[-1, 1]出力の場合: (raw + 1) / 2 で[0, 1]にマッピング
         # sigmoid等の[0, 1]出力の場合: そのまま
-        # 安全のため、[-1, 1]を想定して変換
-        normalized = (raw_value + 1.0) / 2.0
-
-        # [0, 255]にスケール
-        scaled = normalized * (self.color_max - self.color_min) + self.color_min
+        # 安全のため、[-1, 1]を想定して (raw + 1) / 2 * (max - min) + min で[0, 255]にスケール
+        scaled = (raw_value + 1.0) * self._color_scale + self.color_min
 
         # 0-255の範囲にクリップして整数に
         clipped = max(self.color_min, min(self.color_max, scaled))
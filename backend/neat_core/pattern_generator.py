@@ -5,10 +5,15 @@ CPPNからドローンアニメーションを生成します。
 速度出力をオイラー法で時間積分し、フレームごとの位置と色を計算します。
 """
 
-import math
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+import numpy as np
+import orjson
 from neat_core.cppn import CPPN
-from models.animation import Animation, Frame, DroneState
+from models.animation import Animation, DRONE_STATE_DTYPE
+
+
+# JSON出力時の位置の小数点以下桁数（1mm単位。表示には十分で、レスポンスサイズを大きく削減できる）
+JSON_POSITION_DECIMALS = 3
 
 
 class PatternGenerator:
@@ -49,6 +54,10 @@ class PatternGenerator:
                 f"({self.grid_x}x{self.grid_y}x{self.grid_z}={expected_drones})"
             )
 
+        # 初期位置はインスタンスごとに決まっているため、一度だけ計算して配列で保持
+        # （シミュレーションではコピーして使用する）
+        self._initial_positions = self._compute_initial_positions()
+
     def generate_initial_positions(self) -> List[Tuple[float, float, float]]:
         """
         ドローンの初期位置を生成（5x5x2の3Dグリッド配置）
@@ -58,27 +67,110 @@ class PatternGenerator:
         Returns:
             List[Tuple[float, float, float]]: (x, y, z)のタプルのリスト
         """
-        positions = []
+        return [tuple(position) for position in self._initial_positions.tolist()]
 
+    def _compute_initial_positions(self) -> np.ndarray:
+        """
+        ドローンの初期位置を (num_drones, 3) の配列として計算
+
+        Returns:
+            np.ndarray: 初期位置 (num_drones, 3)
+        """
         # グリッドの中心オフセットを計算
-        x_offset = -(self.grid_x - 1) * self.grid_spacing / 2.0
-        y_offset = -(self.grid_y - 1) * self.grid_spacing / 2.0
-        z_offset = -(self.grid_z - 1) * self.grid_spacing / 2.0
+        offsets = np.array([
+            -(self.grid_x - 1) * self.grid_spacing / 2.0,
+            -(self.grid_y - 1) * self.grid_spacing / 2.0,
+            -(self.grid_z - 1) * self.grid_spacing / 2.0,
+        ])
 
         # 3Dグリッドでドローンを配置（Z層 → Y行 → X列 の順）
-        for i in range(self.num_drones):
-            z_idx = i // (self.grid_x * self.grid_y)
-            remainder = i % (self.grid_x * self.grid_y)
-            y_idx = remainder // self.grid_x
-            x_idx = remainder % self.grid_x
+        z_idx, y_idx, x_idx = np.indices((self.grid_z, self.grid_y, self.grid_x)).reshape(3, -1)
+        indices = np.stack([x_idx, y_idx, z_idx], axis=-1)
 
-            x = x_idx * self.grid_spacing + x_offset
-            y = y_idx * self.grid_spacing + y_offset
-            z = z_idx * self.grid_spacing + z_offset
+        return indices * self.grid_spacing + offsets
 
-            positions.append((x, y, z))
+    def _simulate(self, duration: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        CPPNの速度出力を時間積分し、全フレームの位置と色を計算
+
+        Args:
+            duration: アニメーションの長さ（秒）
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]:
+                - 位置 (num_frames, num_drones, 3)
+                - 色 (num_frames, num_drones, 3)
+        """
+        # フレーム数を計算
+        num_frames = int(duration * self.fps) + 1  # +1は最後のフレームを含む
+
+        # 初期位置 (num_drones, 3)
+        positions = self._initial_positions.copy()
+
+        position_history = np.empty((num_frames, self.num_drones, 3), dtype=float)
+        # 色は0-255に収まるためuint8で保持
+        color_history = np.empty((num_frames, self.num_drones, 3), dtype=np.uint8)
+
+        for frame_idx in range(num_frames):
+            # 全ドローンについてまとめてCPPNにクエリして速度と色を取得
+            # 初期位置は毎回同じグリッドのため、同じCPPNで再生成するときは結果を再利用する
+            if frame_idx == 0:
+                velocities, colors = self.cppn.query_batch_memoized(positions)
+            else:
+                velocities, colors = self.cppn.query_batch(positions)
+
+            position_history[frame_idx] = positions
+            color_history[frame_idx] = colors
+
+            # 次のフレームのために位置を更新（オイラー法）
+            # position_new = position_old + velocity × dt
+            # 位置配列はこの関数内でのみ使うため、新しい配列を作らずその場で更新する
+            if frame_idx < num_frames - 1:  # 最後のフレームでは更新しない
+                positions += velocities * self.dt
+
+        return position_history, color_history
+
+    def generate_positions(self, duration: float = 3.0) -> np.ndarray:
+        """
+        CPPNから全フレームのドローン位置だけを計算
 
-        return positions
+        制約チェックのように位置しか使わない用途向けに、フレームの辞書やAnimationモデルを構築しません。
+
+        Args:
+            duration: アニメーションの長さ（秒）
+
+        Returns:
+            np.ndarray: 位置 (num_frames, num_drones, 3)
+        """
+        position_history, _ = self._simulate(duration)
+        return position_history
+
+    def generate_states(self, duration: float = 3.0, position_decimals: Optional[int] = None) -> np.ndarray:
+        """
+        CPPNから全フレームのドローンの状態を構造化配列として計算
+
+        位置と色をDRONE_STATE_DTYPEの1つの連続した配列にまとめ、
+        Pydanticモデルへの変換は必要になった時点（Animation.from_structured）まで行いません。
+
+        Args:
+            duration: アニメーションの長さ（秒）
+            position_decimals: 指定した場合、位置をこの小数点以下桁数に丸める
+
+        Returns:
+            np.ndarray: (num_frames, num_drones) のDRONE_STATE_DTYPE配列（フレームiの時刻は i * dt）
+        """
+        position_history, color_history = self._simulate(duration)
+        if position_decimals is not None:
+            position_history = np.round(position_history, position_decimals)
+
+        states = np.empty(position_history.shape[:2], dtype=DRONE_STATE_DTYPE)
+        states["x"] = position_history[..., 0]
+        states["y"] = position_history[..., 1]
+        states["z"] = position_history[..., 2]
+        states["r"] = color_history[..., 0]
+        states["g"] = color_history[..., 1]
+        states["b"] = color_history[..., 2]
+        return states
 
     def generate_animation(self, duration: float = 3.0) -> Animation:
         """
@@ -90,54 +182,21 @@ class PatternGenerator:
         Returns:
             Animation: 生成されたアニメーション
         """
-        # フレーム数を計算
-        num_frames = int(duration * self.fps) + 1  # +1は最後のフレームを含む
+        return Animation.from_structured(self.genome_id, self.generate_states(duration), self.dt)
+
+    def generate_animation_json(self, duration: float = 3.0) -> bytes:
+        """
+        CPPNからアニメーションを生成し、Animationと同じ形式のJSONバイト列として返す
 
-        # 初期位置
-        positions = self.generate_initial_positions()
+        APIレスポンスとしてそのまま返す用途向けに、Pydanticモデルの構築と検証を省略します。
+        位置は小数点以下JSON_POSITION_DECIMALS桁に丸めて出力します。
 
-        frames = []
+        Args:
+            duration: アニメーションの長さ（秒）
 
-        for frame_idx in range(num_frames):
-            # 現在の時刻
-            t = frame_idx * self.dt
-
-            # 各ドローンの状態を計算
-            drone_states = []
-
-            for drone_idx in range(self.num_drones):
-                x, y, z = positions[drone_idx]
-
-                # CPPNにクエリして速度と色を取得
-                result = self.cppn.query(x, y, z)
-                velocity = result['velocity']
-                color = result['color']
-
-                # DroneStateを作成
-                drone_state = DroneState(
-                    x=x,
-                    y=y,
-                    z=z,
-                    r=color['r'],
-                    g=color['g'],
-                    b=color['b']
-                )
-
-                drone_states.append(drone_state)
-
-                # 次のフレームのために位置を更新（オイラー法）
-                # position_new = position_old + velocity × dt
-                if frame_idx < num_frames - 1:  # 最後のフレームでは更新しない
-                    new_x = x + velocity['vx'] * self.dt
-                    new_y = y + velocity['vy'] * self.dt
-                    new_z = z + velocity['vz'] * self.dt
-                    positions[drone_idx] = (new_x, new_y, new_z)
-
-            # フレームを作成
-            frame = Frame(t=t, drones=drone_states)
-            frames.append(frame)
-
-        # アニメーションを作成
-        animation = Animation(id=self.genome_id, frames=frames)
-
-        return animation
+        Returns:
+            bytes: AnimationのJSON表現
+        """
+        states = self.generate_states(duration, position_decimals=JSON_POSITION_DECIMALS)
+        frames = Animation.frame_dicts_from_structured(states, self.dt)
+        return orjson.dumps({"id": self.genome_id, "frames": frames})
@@ -5,13 +5,108 @@ NEAT集団の管理と進化を担当します。
 集団の初期化、適応度の割り当て、世代の進化を実装します。
 """
 
+import copy
+import os
 import neat
-from typing import List, Dict, Optional, Any
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import compress
+from typing import Callable, List, Dict, Optional, Tuple, Union
 from neat_core.cppn import CPPN
 from neat_core.pattern_generator import PatternGenerator
 from neat_core.custom_reproduction import CustomReproduction
 from models.animation import Animation
-from constraints.constraint_checker import ConstraintChecker, ConstraintParams
+from constraints.constraint_checker import ConstraintChecker, ConstraintParams, GenomeConstraintResult
+
+
+# セッションごとに保持する生成済みアニメーションの上限
+ANIMATION_CACHE_SIZE = 64
+
+# 親を持たないゲノム（初期集団・ランダム生成）の履歴上の親情報
+_NO_PARENTS = (None, None)
+
+# 読み込み済みのNEAT設定（キー: (絶対パス, 更新時刻)）
+_CONFIG_CACHE: Dict[Tuple[str, float], neat.Config] = {}
+
+
+@dataclass(slots=True)
+class GenomeHistoryEntry:
+    """履歴に記録する1ゲノムの情報（ID、親情報、適応度）"""
+    genome_id: int
+    parent1: Optional[int]
+    parent2: Optional[int]
+    fitness: Optional[float]
+
+
+@dataclass(slots=True)
+class GenerationHistoryEntry:
+    """履歴に記録する1世代の情報"""
+    generation: int
+    genomes: List[GenomeHistoryEntry]
+
+
+def _noop_fitness(genomes, config):
+    """
+    何もしない適応度関数（evolve()で適応度は既に割り当て済みのため）
+    """
+    pass
+
+
+def load_config(config_path: str) -> neat.Config:
+    """
+    NEAT設定ファイルを読み込む
+
+    同じファイルは更新されていない限り一度だけ解析し、以降は同じインスタンスを返します。
+    返り値は共有されるため変更しないこと（PopulationManagerはコピーして使用します）。
+
+    Args:
+        config_path: NEAT設定ファイルのパス
+
+    Returns:
+        neat.Config: 読み込んだNEAT設定
+    """
+    config_path = os.path.abspath(config_path)
+    key = (config_path, os.path.getmtime(config_path))
+    config = _CONFIG_CACHE.get(key)
+    if config is None:
+        config = neat.Config(
+            neat.DefaultGenome,
+            CustomReproduction,
+            neat.DefaultSpeciesSet,
+            neat.DefaultStagnation,
+            config_path
+        )
+        _CONFIG_CACHE[key] = config
+    return config
+
+
+def check_genome_constraints(
+    genome: neat.DefaultGenome,
+    config: neat.Config,
+    num_drones: int,
+    duration: float,
+    params: ConstraintParams
+) -> GenomeConstraintResult:
+    """
+    ゲノムからアニメーションを生成し、制約をチェック
+
+    PopulationManagerに依存しないモジュールレベル関数のため、
+    ProcessPoolExecutorのワーカープロセスでも実行できます。
+
+    Args:
+        genome: NEATゲノム
+        config: NEAT設定
+        num_drones: ドローンの数
+        duration: アニメーションの長さ（秒）
+        params: 制約パラメータ
+
+    Returns:
+        GenomeConstraintResult: 制約チェック結果
+    """
+    cppn = CPPN(genome, config)
+    positions = PatternGenerator(cppn, genome.key, num_drones).generate_positions(duration)
+    return ConstraintChecker(params).check_positions(genome.key, positions)
 
 
 class PopulationManager:
@@ -30,20 +125,54 @@ class PopulationManager:
             config_path: NEAT設定ファイルのパス
             num_drones: ドローンの数（デフォルト: 5）
         """
-        # NEAT設定を読み込む
-        self.config = neat.Config(
-            neat.DefaultGenome,
-            CustomReproduction,
-            neat.DefaultSpeciesSet,
-            neat.DefaultStagnation,
-            config_path
-        )
+        # NEAT設定を読み込む（共有の設定をコピーして使用）
+        self._setup(copy.deepcopy(load_config(config_path)), num_drones)
 
+    @classmethod
+    def from_config(cls, config: neat.Config, num_drones: int = 5) -> "PopulationManager":
+        """
+        読み込み済みのNEAT設定からPopulationManagerを作成
+
+        設定ファイルの再読み込みを省略できます。
+        evolve()がreproduction_configを書き換えるため、設定はコピーして使用します。
+
+        Args:
+            config: 共有のNEAT設定（変更されません）
+            num_drones: ドローンの数（デフォルト: 5）
+
+        Returns:
+            PopulationManager: 新しいPopulationManager
+        """
+        population_manager = cls.__new__(cls)
+        population_manager._setup(copy.deepcopy(config), num_drones)
+        return population_manager
+
+    def _setup(self, config: neat.Config, num_drones: int):
+        """
+        NEAT設定から集団を初期化
+
+        Args:
+            config: このインスタンス専用のNEAT設定
+            num_drones: ドローンの数
+        """
+        self.config = config
         self.num_drones = num_drones
 
+        # 入出力ノードIDは設定から決まり変わらないため、一度だけ計算しておく
+        # （入力ノードは負のID、出力ノードは0から始まるID）
+        num_inputs = config.genome_config.num_inputs
+        num_outputs = config.genome_config.num_outputs
+        self._input_ids = tuple(range(-num_inputs, 0))
+        self._output_ids = tuple(range(num_outputs))
+
         # 制約チェッカーを初期化
         self.constraint_checker = ConstraintChecker(ConstraintParams())
 
+        # ゲノムIDごとに構築済みのCPPN（ネットワークと評価計画）をキャッシュ
+        # ゲノムは生成後に変更されないため、次世代に残ったエリート個体はそのまま再利用できる
+        # （初期集団の制約チェックで構築したCPPNも登録するため、集団の作成より前に用意する）
+        self._cppn_cache: Dict[int, CPPN] = {}
+
         # 集団を作成
         self.population = neat.Population(self.config)
 
@@ -56,64 +185,132 @@ class PopulationManager:
         # ゲノムIDからゲノムへのマッピング（現在の世代）
         self.current_genomes: Dict[int, neat.DefaultGenome] = {}
 
+        # ポーリングされる取得系メソッド用のキャッシュ（世代が変わるときに再構築）
+        self._genome_ids_cache: List[int] = []
+        self._assigned_count = 0
+        # ロックを取らない /genomes と /status 用のスナップショット (世代, ゲノムIDリスト, 割り当て済み数)
+        # 更新は常にタプルを1文で代入し直すため、読み取り側は一度の参照で一貫した組を得られる
+        self._status_snapshot: Tuple[int, List[int], int] = (0, [], 0)
+
+        # 現在の世代の適応度をcurrent_genomesと同じ順序で保持する配列（未割り当てはNaN）
+        # 最良ゲノムの探索や選択個体数の集計をゲノムの属性アクセスなしで行う
+        self._genome_index: Dict[int, int] = {}
+        self._fitness_array = np.empty(0)
+
+        # /cppn/{genome_id} 用にシリアライズ済みのCPPN構造（JSONバイト列）をキャッシュ
+        self._cppn_json_cache: Dict[int, bytes] = {}
+        # 生成済みアニメーションのLRUキャッシュ
+        # キー: (ゲノムID, 長さ, JSONか否か)
+        # ゲノムIDはセッション内で一意かつゲノムは生成後に変更されないため、
+        # 次世代に残ったエリート個体のアニメーションは世代をまたいで再利用できる
+        self._animation_cache: "OrderedDict[tuple, Union[Animation, bytes]]" = OrderedDict()
+
         # 進化履歴（世代ごとのゲノム情報）
-        self.history: List[Dict[str, Any]] = []
+        self.history: List[GenerationHistoryEntry] = []
+        # 世代番号からhistory内の位置へのインデックス（履歴を走査せずに参照する）
+        self._history_index: Dict[int, int] = {}
 
         # 初期集団を取得
-        self._update_current_genomes()
+        self._update_current_genomes(self.generation)
 
-    def _update_current_genomes(self):
+    def _update_current_genomes(self, generation: int):
         """
         現在の世代のゲノムを更新
 
         population.populationは{genome_id: genome}の辞書
+        NEAT-Pythonは世代ごとに新しい辞書に置き換えるため、コピーせずにそのまま参照します
+        （current_genomesとpopulation.populationは同じ辞書なので、片方だけを変更しないこと）
+
+        /genomes と /status はロックを取らずにスナップショットを読むため、
+        キャッシュを全て作り直してから最後にスナップショットを公開します。
+
+        Args:
+            generation: 新しい世代番号
+        """
+        self.current_genomes = self.population.population
+        # 読み取り側（イベントループ）がキャッシュを書き込むと古いIDが残る可能性があるため、ここで作成しておく
+        self._genome_ids_cache = list(self.current_genomes)
+        # 集団から外れたゲノムのCPPNを破棄
+        self._cppn_cache = {
+            genome_id: cppn
+            for genome_id, cppn in self._cppn_cache.items()
+            if genome_id in self.current_genomes
+        }
+        self._cppn_json_cache = {
+            genome_id: data
+            for genome_id, data in self._cppn_json_cache.items()
+            if genome_id in self.current_genomes
+        }
+        # 集団から外れたゲノムのアニメーションを破棄（LRUの順序は保つ）
+        self._animation_cache = OrderedDict(
+            (key, animation)
+            for key, animation in self._animation_cache.items()
+            if key[0] in self.current_genomes
+        )
+        # エリート個体は前世代の適応度を引き継ぐため、ここで一度だけ配列を作り直して数え直す
+        self._genome_index = {
+            genome_id: index for index, genome_id in enumerate(self.current_genomes)
+        }
+        self._fitness_array = np.fromiter(
+            (np.nan if g.fitness is None else g.fitness for g in self.current_genomes.values()),
+            dtype=np.float64,
+            count=len(self.current_genomes)
+        )
+        self._assigned_count = int(np.count_nonzero(~np.isnan(self._fitness_array)))
+        self._record_generation_history(generation)
+        self.generation = generation
+        self._publish_status_snapshot()
+
+    def _publish_status_snapshot(self):
+        """
+        世代番号・ゲノムID・割り当て済み数のスナップショットを1文で置き換える
+
+        世代の更新後と、割り当て済み数が変わるたびに呼び出します。
         """
-        self.current_genomes = dict(self.population.population)
-        self._record_generation_history()
+        self._status_snapshot = (self.generation, self._genome_ids_cache, self._assigned_count)
 
-    def _record_generation_history(self):
+    def _record_generation_history(self, generation: int):
         """
         現在の世代のゲノム情報を履歴に記録
+
+        Args:
+            generation: 記録する世代番号
         """
         # population.reproduction.ancestors から親情報を取得
         ancestors = self.population.reproduction.ancestors
 
-        generation_data = {
-            "generation": self.generation,
-            "genomes": []
-        }
-
+        # 親情報は交叉で生まれたゲノムなら(親1, 親2)、初期ゲノムなら空タプル
+        genomes_data = []
         for genome_id, genome in self.current_genomes.items():
-            parent_info = ancestors.get(genome_id, ())
+            parent1, parent2 = ancestors.get(genome_id) or _NO_PARENTS
+            genomes_data.append(GenomeHistoryEntry(genome_id, parent1, parent2, genome.fitness))
 
-            genome_data = {
-                "genome_id": genome_id,
-                "parent1": parent_info[0] if len(parent_info) > 0 else None,
-                "parent2": parent_info[1] if len(parent_info) > 1 else None,
-                "fitness": genome.fitness
-            }
-            generation_data["genomes"].append(genome_data)
+        generation_data = GenerationHistoryEntry(generation, genomes_data)
 
         # 既存の同じ世代のデータがあれば更新、なければ追加
-        existing_idx = next(
-            (i for i, h in enumerate(self.history) if h["generation"] == self.generation),
-            None
-        )
+        existing_idx = self._history_index.get(generation)
         if existing_idx is not None:
             self.history[existing_idx] = generation_data
         else:
+            self._history_index[generation] = len(self.history)
             self.history.append(generation_data)
 
-    def _generate_animation_for_genome(self, genome) -> Animation:
-        """ゲノムオブジェクトからアニメーションを生成"""
-        cppn = CPPN(genome, self.config)
-        pattern_generator = PatternGenerator(cppn, genome.key, self.num_drones)
-        return pattern_generator.generate_animation(duration=3.0)
-
     def _check_genome_constraints(self, genome) -> bool:
         """ゲノムが制約を満たすかチェック"""
-        animation = self._generate_animation_for_genome(genome)
-        result = self.constraint_checker.check_animation(animation)
+        # 集団に残ったエリート個体は構築済みのCPPNを再利用する
+        cppn = self._cppn_cache.get(genome.key)
+        if cppn is None:
+            cppn = CPPN(genome, self.config)
+
+        # 制約チェックには位置だけが必要なため、Animationモデルは構築しない
+        positions = PatternGenerator(cppn, genome.key, self.num_drones).generate_positions(duration=3.0)
+        # 合否だけが必要なため、違反が見つかった時点で残りのチェックを省略する
+        result = self.constraint_checker.check_positions(genome.key, positions, short_circuit=True)
+
+        # 制約を満たしたゲノムは集団に残るため、パターン生成で再利用できるようにCPPNを登録
+        # （集団から外れたものは世代更新時に破棄される）
+        if result.passes_all:
+            self._cppn_cache[genome.key] = cppn
         return result.passes_all
 
     def _create_random_genome(self) -> neat.DefaultGenome:
@@ -205,10 +402,12 @@ class PopulationManager:
         """
         現在の世代の全ゲノムIDを取得
 
+        世代が変わるまで同じリストを返すため、呼び出し側で変更しないこと。
+
         Returns:
             List[int]: ゲノムIDのリスト
         """
-        return list(self.current_genomes.keys())
+        return self._genome_ids_cache
 
     def get_genome(self, genome_id: int) -> Optional[neat.DefaultGenome]:
         """
@@ -222,30 +421,129 @@ class PopulationManager:
         """
         return self.current_genomes.get(genome_id)
 
-    def generate_pattern(self, genome_id: int, duration: float = 3.0) -> Optional[Animation]:
+    def generate_pattern(
+        self,
+        genome_id: int,
+        duration: float = 3.0,
+        as_json: bool = False
+    ) -> Optional[Union[Animation, bytes]]:
         """
         特定のゲノムからアニメーションパターンを生成
 
         Args:
             genome_id: ゲノムID
             duration: アニメーションの長さ（秒）
+            as_json: TrueのときAnimationモデルを構築せず、JSONバイト列を返す
 
         Returns:
-            Animation or None: 生成されたアニメーション（ゲノムが存在しない場合はNone）
+            Animation, bytes or None: 生成されたアニメーション（ゲノムが存在しない場合はNone）
         """
         genome = self.get_genome(genome_id)
         if genome is None:
             return None
 
-        # CPPNを作成
-        cppn = CPPN(genome, self.config)
+        cache_key = self._animation_cache_key(genome_id, duration, as_json)
+        cached = self._animation_cache.get(cache_key)
+        if cached is not None:
+            self._animation_cache.move_to_end(cache_key)
+            return cached
+
+        # CPPNを取得（初回のみ構築）
+        cppn = self._cppn_cache.get(genome_id)
+        if cppn is None:
+            cppn = CPPN(genome, self.config)
+            self._cppn_cache[genome_id] = cppn
 
         # PatternGeneratorを作成してアニメーションを生成
         pattern_generator = PatternGenerator(cppn, genome_id, self.num_drones)
-        animation = pattern_generator.generate_animation(duration)
+        if as_json:
+            animation = pattern_generator.generate_animation_json(duration)
+        else:
+            animation = pattern_generator.generate_animation(duration)
+
+        self._animation_cache[cache_key] = animation
+        while len(self._animation_cache) > ANIMATION_CACHE_SIZE:
+            self._animation_cache.popitem(last=False)
 
         return animation
 
+    def get_cppn_json(
+        self,
+        genome_id: int,
+        build: Callable[[int, neat.DefaultGenome], bytes]
+    ) -> Optional[bytes]:
+        """
+        ゲノムのCPPN構造のJSONバイト列を取得（未作成ならbuildで作成してキャッシュ）
+
+        ゲノムの構造は生成後に変化しないため、同じゲノムへの2回目以降の呼び出しでは
+        キャッシュしたバイト列をそのまま返します（集団から外れたゲノムの分は世代更新時に破棄）。
+
+        Args:
+            genome_id: ゲノムID
+            build: (ゲノムID, ゲノム) からJSONバイト列を作成する関数
+
+        Returns:
+            bytes or None: CPPN構造のJSON（ゲノムが存在しない場合はNone）
+        """
+        genome = self.get_genome(genome_id)
+        if genome is None:
+            return None
+
+        data = self._cppn_json_cache.get(genome_id)
+        if data is None:
+            data = build(genome_id, genome)
+            self._cppn_json_cache[genome_id] = data
+        return data
+
+    def generate_positions_all(self, duration: float = 3.0) -> np.ndarray:
+        """
+        現在の世代の全ゲノムについて、全フレームのドローン位置をまとめて計算
+
+        構築済みのCPPN（制約チェック時に登録されたものを含む）を再利用し、
+        Animationモデルやフレームの辞書は構築しません。
+
+        Args:
+            duration: アニメーションの長さ（秒）
+
+        Returns:
+            np.ndarray: (ゲノム数, フレーム数, ドローン数, 3) の位置配列（get_genome_ids()の順）
+        """
+        positions = []
+        for genome_id in self.get_genome_ids():
+            cppn = self._cppn_cache.get(genome_id)
+            if cppn is None:
+                cppn = CPPN(self.current_genomes[genome_id], self.config)
+                self._cppn_cache[genome_id] = cppn
+            positions.append(PatternGenerator(cppn, genome_id, self.num_drones).generate_positions(duration))
+        return np.stack(positions)
+
+    def get_cached_pattern(
+        self,
+        genome_id: int,
+        duration: float = 3.0,
+        as_json: bool = False
+    ) -> Optional[Union[Animation, bytes]]:
+        """
+        生成済みのアニメーションをキャッシュから取得
+
+        Args:
+            genome_id: ゲノムID
+            duration: アニメーションの長さ（秒）
+            as_json: TrueのときJSONバイト列としてキャッシュされたものを取得
+
+        Returns:
+            Animation, bytes or None: キャッシュ済みのアニメーション（未生成の場合はNone）
+        """
+        cache_key = self._animation_cache_key(genome_id, duration, as_json)
+        animation = self._animation_cache.get(cache_key)
+        if animation is not None:
+            self._animation_cache.move_to_end(cache_key)
+        return animation
+
+    def _animation_cache_key(self, genome_id: int, duration: float, as_json: bool) -> tuple:
+        """アニメーションキャッシュのキーを作成（長さは丸めて浮動小数点の誤差を吸収）"""
+        return (genome_id, round(duration, 3), as_json)
+
     def assign_fitness(self, genome_id: int, fitness: float) -> bool:
         """
         特定のゲノムに適応度を割り当て
@@ -261,7 +559,12 @@ class PopulationManager:
         if genome is None:
             return False
 
+        newly_assigned = genome.fitness is None
         genome.fitness = fitness
+        self._fitness_array[self._genome_index[genome_id]] = fitness
+        if newly_assigned:
+            self._assigned_count += 1
+            self._publish_status_snapshot()
         return True
 
     def assign_fitness_batch(self, fitness_map: Dict[int, float]):
@@ -269,10 +572,43 @@ class PopulationManager:
         複数のゲノムに一括で適応度を割り当て
 
         Args:
-            fitness_map: {genome_id: fitness}の辞書
+            fitness_map: {genome_id: fitness}の辞書（存在しないゲノムIDは無視）
+        """
+        # get_genome_ids()の順に並べた配列を作り、指定のないゲノムはNaNのまま変更しない
+        fitness = np.full(len(self._genome_index), np.nan)
+        for genome_id, value in fitness_map.items():
+            index = self._genome_index.get(genome_id)
+            if index is not None:
+                fitness[index] = value
+        self.assign_fitness_array(fitness)
+
+    def assign_fitness_array(self, fitness: np.ndarray):
+        """
+        get_genome_ids()と同じ順序に並べた配列で適応度を一括割り当て
+
+        呼び出し側で配列をget_genome_ids()の順序に揃えておく必要があります。
+
+        Args:
+            fitness: (集団サイズ,) の適応度配列（NaNの要素のゲノムは変更しない）
+
+        Raises:
+            ValueError: 配列の長さが集団サイズと一致しない場合
         """
-        for genome_id, fitness in fitness_map.items():
-            self.assign_fitness(genome_id, fitness)
+        fitness = np.asarray(fitness, dtype=np.float64)
+        if fitness.shape != self._fitness_array.shape:
+            raise ValueError(
+                f"適応度配列の形状 {fitness.shape} が集団サイズ {self._fitness_array.shape} と一致しません"
+            )
+
+        assigned = ~np.isnan(fitness)
+        for genome, value in zip(
+            compress(self.current_genomes.values(), assigned),
+            fitness[assigned].tolist()
+        ):
+            genome.fitness = value
+        self._fitness_array[assigned] = fitness[assigned]
+        self._assigned_count = int(np.count_nonzero(~np.isnan(self._fitness_array)))
+        self._publish_status_snapshot()
 
     def get_fitness_status(self) -> Dict[str, any]:
         """
@@ -285,7 +621,7 @@ class PopulationManager:
                 - unassigned: 適応度が割り当てられていないゲノム数
         """
         total = len(self.current_genomes)
-        assigned = sum(1 for g in self.current_genomes.values() if g.fitness is not None)
+        assigned = self._assigned_count
         unassigned = total - assigned
 
         return {
@@ -309,10 +645,8 @@ class PopulationManager:
             bool: 進化に成功した場合True
         """
         # 選択された個体数をカウント（fitness > 0 の個体）
-        selected_count = sum(
-            1 for g in self.current_genomes.values()
-            if g.fitness is not None and g.fitness > 0
-        )
+        # （未割り当てのNaNは比較がFalseになるため数えられない）
+        selected_count = int(np.count_nonzero(self._fitness_array > 0))
 
         # 動的にsurvival_thresholdとelitismを計算
         # 選択個体のみが親候補になり、全てそのまま次世代に残るよう設定
@@ -331,28 +665,31 @@ class PopulationManager:
 
         # NEAT進化を1世代実行
         # population.runは通常fitness_functionを受け取るが、
-        # 既に適応度を割り当てているのでダミー関数を使用
-        def dummy_fitness(genomes, config):
-            # 何もしない（適応度は既に割り当て済み）
-            pass
-
+        # 既に適応度を割り当てているので何もしない関数を使用
         # 進化前に現世代のゲノムを保存（親として使用するため）
         previous_genomes = dict(self.population.population)
 
         # 1世代だけ進化
-        self.population.run(dummy_fitness, 1)
+        self.population.run(_noop_fitness, 1)
 
         # 子孫が制約を満たすことを保証（保存した親ゲノムを渡す）
         self._ensure_valid_offspring(previous_genomes)
 
-        # 世代カウンターを更新
-        self.generation += 1
-
-        # 新しい世代のゲノムを取得
-        self._update_current_genomes()
+        # 新しい世代のゲノムを取得し、最後に世代カウンターを更新
+        self._update_current_genomes(self.generation + 1)
 
         return True
 
+    @property
+    def input_ids(self) -> Tuple[int, ...]:
+        """入力ノードIDのタプル（負のID、設定から決まり変化しない）"""
+        return self._input_ids
+
+    @property
+    def output_ids(self) -> Tuple[int, ...]:
+        """出力ノードIDのタプル（0から始まるID、設定から決まり変化しない）"""
+        return self._output_ids
+
     def get_generation(self) -> int:
         """
         現在の世代番号を取得
@@ -362,6 +699,18 @@ class PopulationManager:
         """
         return self.generation
 
+    def get_status_snapshot(self) -> Tuple[int, List[int], int]:
+        """
+        世代番号・ゲノムID・割り当て済み数の組を取得
+
+        3つの値は同時に公開されるため、ロックなしで読んでも互いに食い違わない。
+        ゲノムIDのリストは世代が変わるまで同じものを返すため、呼び出し側で変更しないこと。
+
+        Returns:
+            Tuple[int, List[int], int]: (世代番号, ゲノムIDのリスト, 割り当て済みのゲノム数)
+        """
+        return self._status_snapshot
+
     def get_population_size(self) -> int:
         """
         集団サイズを取得
@@ -378,22 +727,20 @@ class PopulationManager:
         Returns:
             neat.DefaultGenome or None: 最良ゲノム（適応度が割り当てられていない場合はNone）
         """
-        genomes_with_fitness = [
-            g for g in self.current_genomes.values()
-            if g.fitness is not None
-        ]
-
-        if not genomes_with_fitness:
+        if self._assigned_count == 0:
             return None
 
-        return max(genomes_with_fitness, key=lambda g: g.fitness)
+        # 同じ適応度の場合はmax()と同様に先頭のゲノムを返す
+        best_index = int(np.nanargmax(self._fitness_array))
+        return list(self.current_genomes.values())[best_index]
 
-    def get_evolution_history(self) -> List[Dict[str, Any]]:
+    def get_evolution_history(self) -> List[GenerationHistoryEntry]:
         """
         全世代の進化履歴を取得
 
         Returns:
-            List[Dict]: 世代ごとのゲノム情報リスト
+            List[GenerationHistoryEntry]: 世代ごとのゲノム情報リスト
+                （dataclassのため、orjsonでそのままシリアライズできる）
         """
         # 現在の世代の適応度情報を履歴に反映
         self._update_current_generation_fitness()
@@ -403,16 +750,10 @@ class PopulationManager:
         """
         現在の世代のゲノムの適応度情報を履歴に反映
         """
-        if not self.history:
-            return
-
-        current_gen_data = next(
-            (h for h in self.history if h["generation"] == self.generation),
-            None
-        )
-
-        if current_gen_data:
-            for genome_data in current_gen_data["genomes"]:
-                genome = self.current_genomes.get(genome_data["genome_id"])
+        current_idx = self._history_index.get(self.generation)
+        if current_idx is not None:
+            current_gen_data = self.history[current_idx]
+            for genome_data in current_gen_data.genomes:
+                genome = self.current_genomes.get(genome_data.genome_id)
                 if genome:
-                    genome_data["fitness"] = genome.fitness
+                    genome_data.fitness = genome.fitness
@@ -8,14 +8,26 @@ Usage:
     python tests/test_constraint_satisfaction.py
 """
 
+import multiprocessing
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List
 
 # backendディレクトリをパスに追加
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from neat_core.population_manager import PopulationManager
-from constraints.constraint_checker import ConstraintParams, ConstraintChecker
+from neat_core.population_manager import PopulationManager, load_config
+from constraints.constraint_checker import ConstraintChecker, ConstraintParams, GenomeConstraintResult
+
+
+def _run_trial(config, num_drones: int, duration: float, params: ConstraintParams) -> List[GenomeConstraintResult]:
+    """1試行分の集団を生成し、全ゲノムの制約チェック結果を返す（ワーカープロセスで実行）"""
+    pm = PopulationManager.from_config(config, num_drones=num_drones)
+    # 集団生成時の制約チェックで構築したCPPNを再利用し、全ゲノムの位置をまとめて計算してチェック
+    positions = pm.generate_positions_all(duration)
+    return ConstraintChecker(params).check_many(pm.get_genome_ids(), positions)
 
 
 def run_test(num_trials: int = 100):
@@ -28,9 +40,11 @@ def run_test(num_trials: int = 100):
         'neat_config.txt'
     )
     config_path = os.path.abspath(config_path)
+    # 設定ファイルは一度だけ読み込み、各試行ではコピーから集団を作成する
+    config = load_config(config_path)
 
     params = ConstraintParams()
-    checker = ConstraintChecker(params)
+    duration = 3.0
 
     # 統計カウンター
     total_genomes = 0
@@ -47,33 +61,39 @@ def run_test(num_trials: int = 100):
     print(f"  Min Distance: {params.min_distance}m")
     print(f"\nRunning {num_trials} trials...")
 
-    for trial in range(num_trials):
-        # 新しい集団を生成
-        pm = PopulationManager(config_path, num_drones=50)
-        genome_ids = pm.get_genome_ids()
-
-        for genome_id in genome_ids:
-            animation = pm.generate_pattern(genome_id, duration=3.0)
-            if animation is None:
-                continue
-
-            result = checker.check_animation(animation)
-            total_genomes += 1
-
-            if result.bounds_violations == 0:
-                pass_bounds += 1
-            if result.horizontal_speed_violations == 0:
-                pass_h_speed += 1
-            if result.vertical_speed_violations == 0:
-                pass_v_speed += 1
-            if result.distance_violations == 0:
-                pass_distance += 1
-            if result.passes_all:
-                pass_all += 1
-
-        # 進捗表示
-        if (trial + 1) % 10 == 0:
-            print(f"  Progress: {trial + 1}/{num_trials} trials")
+    # 各試行（集団生成・パターン生成・制約チェック）は独立したCPUバウンド処理のため、
+    # 試行単位でプロセスプールに割り当てる（プールは全試行で使い回す）
+    # APIと同じくワーカーはspawnで起動する（各ワーカーの乱数は起動時に個別に初期化される）
+    with ProcessPoolExecutor(
+        max_workers=os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        trial_results = pool.map(
+            _run_trial,
+            repeat(config, num_trials),
+            repeat(50),
+            repeat(duration),
+            repeat(params)
+        )
+
+        for trial, results in enumerate(trial_results):
+            for result in results:
+                total_genomes += 1
+
+                if result.bounds_violations == 0:
+                    pass_bounds += 1
+                if result.horizontal_speed_violations == 0:
+                    pass_h_speed += 1
+                if result.vertical_speed_violations == 0:
+                    pass_v_speed += 1
+                if result.distance_violations == 0:
+                    pass_distance += 1
+                if result.passes_all:
+                    pass_all += 1
+
+            # 進捗表示
+            if (trial + 1) % 10 == 0:
+                print(f"  Progress: {trial + 1}/{num_trials} trials")
 
     # 結果出力
     print(f"\n=== Results ===")
@@ -0,0 +1,55 @@
+"""
+進化履歴インデックスのテスト
+
+世代番号からhistory内の位置を引くインデックス（_history_index）が、
+historyを線形に走査した場合と同じエントリを返すことを確認する。
+
+Usage:
+    cd backend
+    python -m pytest tests/test_history_index.py
+"""
+
+import os
+import random
+import sys
+
+# backendディレクトリをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from neat_core.population_manager import PopulationManager
+
+
+CONFIG_PATH = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    '..',
+    'config',
+    'neat_config.txt'
+))
+
+
+def _linear_lookup(history, generation):
+    """インデックス導入前と同じ線形走査で世代の位置を探す"""
+    return next((i for i, h in enumerate(history) if h.generation == generation), None)
+
+
+def test_history_index_matches_linear_scan():
+    random.seed(0)
+    pm = PopulationManager(CONFIG_PATH, num_drones=50)
+
+    for _ in range(3):
+        genome_ids = pm.get_genome_ids()
+        pm.assign_fitness_batch({genome_id: random.choice([0.0, 0.5, 1.0]) for genome_id in genome_ids[:6]})
+        pm.evolve()
+
+    # 同じ世代を記録し直しても、追加されずに既存のエントリが置き換えられる
+    history_length = len(pm.history)
+    pm._record_generation_history(pm.generation)
+    assert len(pm.history) == history_length
+
+    for generation in range(pm.generation + 2):
+        assert pm._history_index.get(generation) == _linear_lookup(pm.history, generation)
+
+
+if __name__ == "__main__":
+    test_history_index_matches_linear_scan()
+    print("OK")